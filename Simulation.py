@@ -1,76 +1,94 @@
+"""Monte Carlo simulation of Blackjack, with a command line for batch jobs.
+
+    python Simulation.py -n 1000000 --engine numpy --workers 4 --seed 1 --format json -o results.json
+    python Simulation.py -n 100000 --plot results.png
+
+matplotlib is only imported when a plot is requested.
+"""
+import argparse
+import csv
+import json
+import math
 import random
 import os
-import matplotlib.pyplot as plt
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from statistics import NormalDist
+import numpy as np
+import batch_engine
+from cards import Hand, Shoe, card_name, card_value
 
 def clear_screen():
     """Clears the console screen (works for Windows & Mac/Linux)."""
     os.system('cls' if os.name == 'nt' else 'clear')
 
 class Player:
-    def __init__(self, name):
+    def __init__(self, name, policy=None):
         self.name = name
-        self.hand = []
+        self.hand = Hand()
+        self.policy = policy
 
     def draw_hand(self, deck):
         """Draws two random cards from the deck and removes them from the deck."""
         for _ in range(2):
-            card = random.choice(deck)
-            self.hand.append(card)
-            deck.remove(card)
+            self.hand.add(deck.draw())
 
     def hit(self, deck):
         """Draws one more card when the player chooses to hit and removes it from the deck."""
-        card = random.choice(deck)
-        self.hand.append(card)  # Append only one new card to the hand
-        deck.remove(card)  # Ensure the card is removed from the deck
+        self.hand.add(deck.draw())  # Append only one new card to the hand
 
     def show_hand(self):
         """Displays the player's hand inside brackets."""
-        return f"[{', '.join(self.hand)}]"
+        return f"[{', '.join(map(card_name, self.hand))}]"
 
     def evaluate_hand(self):
         """Evaluates the hand based on Blackjack rules (Aces can be 1 or 11)."""
-        values = {'J': 10, 'Q': 10, 'K': 10}  # Face cards mapped
-        hand_value = 0
-        aces = 0
-
-        for card in self.hand:
-            rank = card.split()[0]  # Extract rank (e.g., 'A', '10', 'K')
-
-            if rank == 'A':
-                aces += 1
-            elif rank in values:
-                hand_value += values[rank]
-            else:
-                hand_value += int(rank)  # Convert numbered cards
-
-        # Add Aces as 11, but if that causes a bust, treat them as 1
-        for _ in range(aces):
-            if hand_value + 11 <= 21:
-                hand_value += 11
-            else:
-                hand_value += 1
+        return self.hand.value()
 
-        return hand_value
+    def should_hit(self, upcard=None):
+        """Automatically decides whether to hit or stand based on a simple strategy.
 
-    def should_hit(self):
-        """Automatically decides whether to hit or stand based on a simple strategy."""
+        If the player has a policy (see strategy.py), it decides instead, given the
+        value of the dealer's upcard.
+        """
         score = self.evaluate_hand()
+        if self.policy is not None:
+            return self.policy.should_hit(score, self.hand.is_soft(), upcard)
         # Simple strategy: hit if score is less than 17
         return score < 17
 
 
-def play_blackjack(verbose=False):
-    """Plays a single round of Blackjack. Set verbose=True to print details."""
+def play_blackjack(verbose=False, rng=random, policy=None, log=None, stats=None):
+    """Plays a single round of Blackjack. Set verbose=True to print details.
+
+    rng is the random.Random instance cards are drawn with (the global one by default).
+    policy is the player's hit/stand Policy (see strategy.py); by default the player
+    hits below 17. With a hand_log.HandLog as log, the round is recorded in it, and
+    with a round_stats.RoundStats as stats, it is counted in it.
+    """
     # Initialize deck
-    cardsuits = ['Spades', 'Clubs', 'Hearts', 'Diamonds']
-    cardtypes = ['A', 2, 3, 4, 5, 6, 7, 8, 9, 10, 'J', 'Q', 'K']
-    deck = [f"{card} of {suit}" for suit in cardsuits for card in cardtypes]
+    deck = Shoe(random_draw=True, rng=rng)
 
     # Create player and computer
-    player = Player("Player")
+    player = Player("Player", policy)
     computer = Player("Computer")
 
+    winner = _play_round(player, computer, deck, verbose)
+    if log is not None:
+        log.append(player.hand, computer.hand, batch_engine.OUTCOMES.index(winner))
+    if stats is not None:
+        player_score = player.evaluate_hand()
+        computer_score = computer.evaluate_hand()
+        player_natural = len(player.hand) == 2 and player_score == 21
+        computer_natural = len(computer.hand) == 2 and computer_score == 21
+        stats.record_round(card_value(computer.hand[0]), len(player.hand) - 2, player_score, computer_score,
+                           not (player_natural or computer_natural) and player_score < 21, player_natural,
+                           computer_natural)
+    return winner
+
+
+def _play_round(player, computer, deck, verbose):
+    """Deals and plays out a round between player and computer, returning the winner."""
     # Assign hands
     player.draw_hand(deck)
     computer.draw_hand(deck)
@@ -82,7 +100,7 @@ def play_blackjack(verbose=False):
     if verbose:
         print(f"{player.name}'s Hand: {player.show_hand()}")
         print(f"Score: {player_score}\n")
-        print(f"Computer's First Card: [{computer.hand[0]}] (Computer's score hidden)\n")
+        print(f"Computer's First Card: [{card_name(computer.hand[0])}] (Computer's score hidden)\n")
 
     # Check if player got natural blackjack (21) at the start
     if player_score == 21:
@@ -106,7 +124,7 @@ def play_blackjack(verbose=False):
 
     # Player's turn (Automated)
     while player_score < 21:  # Stop the loop if score reaches 21
-        if player.should_hit():
+        if player.should_hit(card_value(computer.hand[0])):
             player.hit(deck)  # Add one new card to the hand
             player_score = player.evaluate_hand()  # Re-evaluate the score
             if verbose:
@@ -173,22 +191,256 @@ def play_blackjack(verbose=False):
 
 
 # Monte Carlo Simulation
-def monte_carlo_simulation(num_simulations=1000):
-    """Runs multiple simulations of Blackjack and collects statistics."""
-    results = {"Player": 0, "Computer": 0, "Tie": 0}
-
-    for _ in range(num_simulations):
-        winner = play_blackjack(verbose=False)  # Run without printing details
-        results[winner] += 1
+def _run_shard(num_simulations, engine, seed_seq, policy=None, rules=None, history=None, first_round=0,
+               stats=None):
+    """Plays one shard of a simulation with its own generator seeded from seed_seq.
+
+    With history, a hand log path, the shard's rounds are appended to it, tagged
+    with the shard's seed and numbered on from first_round. With stats, a
+    round_stats.RoundStats, they are counted in it.
+    """
+    shard_seed = int(seed_seq.generate_state(1, np.uint64)[0])
+    log = None
+    if history is not None:
+        from hand_log import HandLog
+        log = HandLog(history, seed=shard_seed, first_round=first_round)
+    try:
+        if engine == "numpy":
+            return batch_engine.simulate(num_simulations, np.random.default_rng(seed_seq), policy, rules=rules,
+                                         log=log, stats=stats)
+
+        rng = random.Random(shard_seed)
+        results = {"Player": 0, "Computer": 0, "Tie": 0}
+        for _ in range(num_simulations):
+            winner = play_blackjack(verbose=False, rng=rng, policy=policy, log=log, stats=stats)  # Without printing
+            results[winner] += 1
+        return results
+    finally:
+        if log is not None:
+            log.close()
+
+
+def _run_shard_with_stats(*args):
+    """_run_shard, also returning the RoundStats it filled, for shards run in worker processes."""
+    from round_stats import RoundStats
+    stats = RoundStats()
+    return _run_shard(*args, stats=stats), stats
+
+
+def _check_engine(engine, rules):
+    if engine not in ("python", "numpy"):
+        raise ValueError(f"Unknown engine {engine!r}. Choose 'python' or 'numpy'.")
+    if rules is not None and engine != "numpy":
+        raise ValueError("Rule sets are only played by the numpy engine.")
+
+
+def monte_carlo_simulation(num_simulations=1000, engine="python", workers=None, seed=None,
+                           policy=None, rules=None, history=None, stats=None):
+    """Runs multiple simulations of Blackjack and collects statistics.
+
+    engine="python" plays each round through play_blackjack; engine="numpy" plays
+    the rounds in vectorized batches (see batch_engine.py) under the same rules.
+
+    The rounds are split into one shard per worker, each with its own generator
+    spawned from the master seed, and shards run in a process pool when workers > 1.
+    For a given (seed, num_simulations, workers) the results are always identical.
+
+    policy is the player's Policy (see strategy.py), used by both engines. rules is
+    a RuleSet (see rules.py) for the numpy engine to play instead of play_blackjack's
+    rules; the results then also hold the "Units" the player won and their
+    "UnitsSquared" (see batch_engine.simulate).
+
+    history is the path of a hand log (see hand_log.py) to append every round to;
+    each shard numbers its rounds from its offset in the whole run. stats is a
+    round_stats.RoundStats to count the rounds in; each shard fills its own, and
+    they are merged into it.
+    """
+    _check_engine(engine, rules)
+    workers = workers or 1
+
+    # Spread the rounds as evenly as possible, one shard and child seed per worker
+    sizes = [num_simulations // workers + (i < num_simulations % workers) for i in range(workers)]
+    seeds = np.random.SeedSequence(seed).spawn(workers)
+    first_rounds = [sum(sizes[:i]) for i in range(workers)]
+    if history is not None:
+        # Write the header before any worker opens the log
+        from hand_log import HandLog
+        HandLog(history, buffer_records=1).close()
+
+    run = _run_shard if stats is None else _run_shard_with_stats
+    if workers == 1:
+        shards = [run(sizes[0], engine, seeds[0], policy, rules, history)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            shards = list(pool.map(run, sizes, [engine] * workers, seeds, [policy] * workers,
+                                   [rules] * workers, [history] * workers, first_rounds))
+    if stats is not None:
+        for _, shard_stats in shards:
+            stats.merge(shard_stats)
+        shards = [results for results, _ in shards]
+
+    results = dict.fromkeys(shards[0], 0)
+    for shard in shards:
+        for outcome, count in shard.items():
+            results[outcome] += count
 
     return results
 
 
+def edge_summary(results, confidence=0.95):
+    """Returns the player's edge per round with its standard error and confidence interval.
+
+    The edge is the mean result of a one-unit bet: +1 for a Player win, -1 for a
+    Computer win and 0 for a tie, or the mean "Units" won when the results hold them.
+    """
+    rounds = results["Player"] + results["Computer"] + results["Tie"]
+    if "Units" in results:
+        edge = results["Units"] / rounds
+        variance = results["UnitsSquared"] / rounds - edge ** 2
+    else:
+        edge = (results["Player"] - results["Computer"]) / rounds
+        variance = (results["Player"] + results["Computer"]) / rounds - edge ** 2
+    stderr = math.sqrt(variance / rounds)
+    half_width = NormalDist().inv_cdf(0.5 + confidence / 2) * stderr
+    return {"rounds": rounds, "edge": edge, "stderr": stderr,
+            "ci": (edge - half_width, edge + half_width)}
+
+
+def monte_carlo_stream(report_every=100_000, engine="numpy", seed=None, policy=None,
+                       max_simulations=None, target_ci=None, confidence=0.95, rules=None, stats=None):
+    """Runs the simulation in chunks, yielding the running results after each one.
+
+    Every report_every rounds it yields the running Player/Computer/Tie counts merged
+    with edge_summary(). The stream ends after max_simulations rounds, or, with
+    target_ci, as soon as the standard error of the edge drops below target_ci.
+    Without either it runs until the caller stops iterating.
+    Chunks get successive child seeds of seed, so a seeded stream is reproducible.
+    With a round_stats.RoundStats as stats, every round is counted in it.
+    """
+    _check_engine(engine, rules)
+    seed_seq = np.random.SeedSequence(seed)
+    results = {"Player": 0, "Computer": 0, "Tie": 0}
+    rounds = 0
+
+    while max_simulations is None or rounds < max_simulations:
+        size = report_every
+        if max_simulations is not None:
+            size = min(size, max_simulations - rounds)
+        for outcome, count in _run_shard(size, engine, seed_seq.spawn(1)[0], policy, rules, stats=stats).items():
+            results[outcome] = results.get(outcome, 0) + count
+        rounds += size
+
+        snapshot = {**results, **edge_summary(results, confidence)}
+        yield snapshot
+        if target_ci is not None and snapshot["stderr"] < target_ci:
+            return
+
+
+def compare_policies(policy_a, policy_b, num_samples=100_000, seed=None, rules=None, common=True,
+                     antithetic=True, stratify=True, batch_size=100_000, confidence=0.95):
+    """Estimates how many more units per round policy_a wins than policy_b, with variance reduction.
+
+    Each sample is a shuffled deck played by both policies (see batch_engine.play_ranks):
+    - common: both play the same deck (common random numbers), so luck they share
+      cancels out of the difference; otherwise policy_b gets a deck of its own.
+    - antithetic: each deck is also played mirrored (see batch_engine.mirror_ranks)
+      and the sample is the mean of the pair.
+    - stratify: samples are spread evenly over the 13 dealer upcard ranks, each of
+      which comes up 1 time in 13, and the strata are weighted by that.
+    Every variant is unbiased. Returns a dict with the EV of each policy, their
+    paired "difference" with its "stderr" and "ci", the hands played, and
+    "variance_reduction": how many times as many hands two independent runs would
+    need for the same stderr. With stratify, "by_upcard" has the difference by
+    upcard value (1 for Aces). The variance is estimated per stratum, so each needs
+    at least two samples: num_samples must be at least 26 with stratify, else 2.
+    """
+    strata = batch_engine.NUM_RANKS if stratify else 1
+    if num_samples < 2 * strata:
+        raise ValueError(f"Need at least {2 * strata} samples to estimate the variance, got {num_samples}.")
+    rng = np.random.default_rng(seed)
+    rules = batch_engine.CLASSIC if rules is None else rules
+    # Per stratum: samples, then the sum and sum of squares of the difference, a's and b's EV
+    sums = np.zeros((7, strata))
+    # Per policy: hands, and the sum and sum of squares of their payouts
+    hands = np.zeros((2, 3))
+    # Per upcard rank: decks played and the sum of their differences, mirrored decks under their own upcard
+    upcard_sums = np.zeros((2, strata))
+
+    for start in range(0, num_samples, batch_size):
+        size = min(batch_size, num_samples - start)
+        stratum = (start + np.arange(size)) % strata
+        upcards = stratum if stratify else None
+        decks = batch_engine.shuffled_ranks(size, rng, upcards)
+        payouts = []
+        plays = []
+        for index, policy in enumerate((policy_a, policy_b)):
+            if index and not common:
+                decks = batch_engine.shuffled_ranks(size, rng, upcards)
+            played = [batch_engine.play_ranks(decks, policy, rules)]
+            if antithetic:
+                played.append(batch_engine.play_ranks(batch_engine.mirror_ranks(decks), policy, rules))
+            for net in played:
+                hands[index] += (net.size, net.sum(), np.dot(net, net))
+            plays.append(played)
+            payouts.append(sum(played) / len(played))
+        for net_a, net_b, upcard in zip(*plays, (stratum, strata - 1 - stratum)):
+            upcard_sums += (np.bincount(upcard, minlength=strata),
+                            np.bincount(upcard, weights=net_a - net_b, minlength=strata))
+        difference = payouts[0] - payouts[1]
+        for row, values in enumerate((np.ones(size), difference, difference ** 2, payouts[0], payouts[0] ** 2,
+                                      payouts[1], payouts[1] ** 2)):
+            sums[row] += np.bincount(stratum, weights=values, minlength=strata)
+
+    counts = sums[0]
+    weights = np.full(strata, 1 / strata)
+    means = sums[1] / counts
+    variances = (sums[2] - counts * means ** 2) / (counts - 1)
+    difference = float(weights @ means)
+    stderr = math.sqrt(float((weights ** 2 * variances / counts).sum()))
+    half_width = NormalDist().inv_cdf(0.5 + confidence / 2) * stderr
+
+    # Two independent runs of as many hands each would have the variance of a's plus b's
+    hand_means = hands[:, 1] / hands[:, 0]
+    hand_variances = hands[:, 2] / hands[:, 0] - hand_means ** 2
+    independent_variance = float((hand_variances / hands[:, 0]).sum())
+
+    summary = {
+        "samples": num_samples,
+        "hands": int(hands[:, 0].sum()),
+        "ev_a": float(weights @ (sums[3] / counts)),
+        "ev_b": float(weights @ (sums[5] / counts)),
+        "difference": difference,
+        "stderr": stderr,
+        "ci": (difference - half_width, difference + half_width),
+        "variance_reduction": independent_variance / stderr ** 2 if stderr else math.inf,
+    }
+    if stratify:
+        values = batch_engine.RANK_VALUES
+        summary["by_upcard"] = {int(value): float(upcard_sums[1, values == value].sum()
+                                                  / upcard_sums[0, values == value].sum())
+                                for value in np.unique(values)}
+    return summary
+
+
 # Function to plot results
-def plot_results(results, chart_type="bar"):
-    """Plots the results of the Monte Carlo simulation using matplotlib."""
-    labels = list(results.keys())
-    values = list(results.values())
+def plot_results(results, chart_type="bar", path=None):
+    """Plots the results of the Monte Carlo simulation using matplotlib.
+
+    With a path the chart is rendered to that file (PNG, SVG, PDF, ... by its
+    extension) with the non-interactive Agg backend; otherwise it is shown in a window.
+    """
+    if chart_type not in ("bar", "pie"):
+        print("Invalid chart type. Choose 'bar' or 'pie'.")
+        return
+
+    import matplotlib
+    if path is not None:
+        matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    labels = list(batch_engine.OUTCOMES)
+    values = [results[outcome] for outcome in labels]
+    figure = plt.figure()
 
     if chart_type == "bar":
         # Bar Chart
@@ -196,29 +448,153 @@ def plot_results(results, chart_type="bar"):
         plt.title("Blackjack Monte Carlo Simulation Results")
         plt.xlabel("Outcome")
         plt.ylabel("Number of Wins")
-        plt.show()
-
-    elif chart_type == "pie":
+    else:
         # Pie Chart
         plt.pie(values, labels=labels, autopct="%1.1f%%", colors=["blue", "red", "green"])
         plt.title("Blackjack Monte Carlo Simulation Results")
-        plt.show()
 
+    if path is None:
+        plt.show()
     else:
-        print("Invalid chart type. Choose 'bar' or 'pie'.")
+        figure.savefig(path)
+        plt.close(figure)
+
+
+def export_results(results, fmt, out, config=None, stats=None):
+    """Writes results and their edge_summary() to out as "json" or "csv", or to the path out as "npz".
+
+    With a round_stats.RoundStats as stats, its counters are written too.
+    """
+    summary = edge_summary(results)
+    if fmt == "json":
+        document = {"config": config or {}, "results": results, **summary}
+        if stats is not None:
+            document["stats"] = {**stats.to_dict(), **stats.summary()}
+        json.dump(document, out, indent=2)
+        out.write("\n")
+    elif fmt == "csv":
+        writer = csv.writer(out)
+        writer.writerow(["metric", "value"])
+        writer.writerows(results.items())
+        writer.writerows([("edge", summary["edge"]), ("stderr", summary["stderr"]),
+                          ("ci_low", summary["ci"][0]), ("ci_high", summary["ci"][1])])
+        if stats is not None:
+            for name, counts in stats.to_dict().items():
+                if isinstance(counts, list):
+                    writer.writerows((f"{name}[{index}]", count) for index, count in enumerate(counts))
+                else:
+                    writer.writerow((name, counts))
+    elif fmt == "npz":
+        arrays = {} if stats is None else {f"stats_{name}": array for name, array in stats.arrays().items()}
+        np.savez(out, outcomes=np.array(list(results)), counts=np.array(list(results.values())),
+                 edge=summary["edge"], stderr=summary["stderr"], ci=np.array(summary["ci"]),
+                 config=json.dumps(config or {}), **arrays)
+    else:
+        raise ValueError(f"Unknown format {fmt!r}. Choose 'json', 'csv' or 'npz'.")
+
+
+def _policy_arg(parser, text, rules):
+    """Parses a --compare policy: a hit-below threshold, or 'basic' for basic strategy."""
+    import strategy
+    if text == "basic":
+        return strategy.basic_strategy(rules=rules or batch_engine.CLASSIC)
+    try:
+        return strategy.threshold_policy(int(text))
+    except ValueError:
+        parser.error(f"--compare policy must be a number or 'basic', got {text!r}")
+
+
+def main(argv=None):
+    """Command-line entry point: runs a simulation and prints, exports or plots the results."""
+    from rules import RULE_SETS
+
+    parser = argparse.ArgumentParser(description="Monte Carlo simulation of Blackjack.")
+    parser.add_argument("-n", "--simulations", type=int, default=1000, help="rounds to play")
+    parser.add_argument("--seed", type=int, help="master seed, for reproducible results")
+    parser.add_argument("--engine", choices=("python", "numpy"), default="python")
+    parser.add_argument("--workers", type=int, default=1, help="processes to spread the rounds over")
+    parser.add_argument("--rules", choices=sorted(RULE_SETS), help="rule set for the numpy engine")
+    parser.add_argument("--format", choices=("text", "json", "csv", "npz"), default="text")
+    parser.add_argument("-o", "--output", help="file to write the results to (default: standard output)")
+    parser.add_argument("--plot", metavar="FILE", help="render a chart of the results to FILE")
+    parser.add_argument("--chart", choices=("bar", "pie"), default="bar", help="chart type for --plot")
+    parser.add_argument("--hand-log", metavar="FILE", help="append every round to the hand log FILE")
+    parser.add_argument("--stats", action="store_true",
+                        help="also collect per-round statistics: dealer busts by upcard, draws, naturals, totals")
+    parser.add_argument("--compare", nargs=2, metavar="POLICY",
+                        help="estimate the EV difference of two policies on common decks instead: "
+                             "a number to hit below it, or 'basic' for basic strategy")
+    parser.add_argument("--no-common", dest="common", action="store_false",
+                        help="with --compare, give each policy its own decks")
+    parser.add_argument("--no-antithetic", dest="antithetic", action="store_false",
+                        help="with --compare, don't also play mirrored decks")
+    parser.add_argument("--no-stratify", dest="stratify", action="store_false",
+                        help="with --compare, don't stratify by dealer upcard")
+    args = parser.parse_args(argv)
+    if args.format == "npz" and not args.output:
+        parser.error("--format npz needs --output")
+    if args.rules and args.engine != "numpy" and not args.compare:
+        parser.error("--rules needs --engine numpy")
+    if args.compare and args.format not in ("text", "json"):
+        parser.error("--compare writes text or json")
+
+    rules = RULE_SETS[args.rules] if args.rules else None
+    if args.compare:
+        policies = [_policy_arg(parser, text, rules) for text in args.compare]
+        try:
+            summary = compare_policies(*policies, num_samples=args.simulations, seed=args.seed, rules=rules,
+                                       common=args.common, antithetic=args.antithetic, stratify=args.stratify)
+        except ValueError as error:
+            parser.error(str(error))
+        if args.format == "json":
+            document = json.dumps({"policies": args.compare, **summary}, indent=2) + "\n"
+            if args.output:
+                with open(args.output, "w") as f:
+                    f.write(document)
+            else:
+                sys.stdout.write(document)
+        else:
+            low, high = summary["ci"]
+            print(f"{args.compare[0]} vs {args.compare[1]} over {summary['hands']} hands:")
+            print(f"EV: {summary['ev_a']:+.5f} vs {summary['ev_b']:+.5f}")
+            print(f"Difference: {summary['difference']:+.5f} +/- {summary['stderr']:.5f} "
+                  f"(95% CI {low:+.5f} to {high:+.5f})")
+            print(f"Variance reduction: {summary['variance_reduction']:.1f}x")
+        return
+
+    stats = None
+    if args.stats:
+        from round_stats import RoundStats
+        stats = RoundStats()
+    results = monte_carlo_simulation(args.simulations, engine=args.engine, workers=args.workers,
+                                     seed=args.seed, rules=rules, history=args.hand_log, stats=stats)
+    config = {"simulations": args.simulations, "seed": args.seed, "engine": args.engine,
+              "workers": args.workers, "rules": args.rules}
+
+    if args.format == "npz":
+        export_results(results, "npz", args.output, config, stats)
+    elif args.format != "text":
+        if args.output:
+            with open(args.output, "w", newline="") as f:
+                export_results(results, args.format, f, config, stats)
+        else:
+            export_results(results, args.format, sys.stdout, config, stats)
+    else:
+        # Print results
+        print(f"Results after {args.simulations} simulations:")
+        print(f"Player wins: {results['Player']}")
+        print(f"Computer wins: {results['Computer']}")
+        print(f"Ties: {results['Tie']}")
+        if stats is not None:
+            summary = stats.summary()
+            print("Naturals: " + ", ".join(f"{who} {rate:.2%}" for who, rate in summary["natural_rate"].items()))
+            print(f"Mean player draws: {summary['mean_player_draws']:.3f}")
+            print("Dealer bust rate by upcard: " + ", ".join(
+                f"{'A' if upcard == 1 else upcard} {rate:.1%}" for upcard, rate in summary["dealer_bust_rate"].items()))
+
+    if args.plot:
+        plot_results(results, chart_type=args.chart, path=args.plot)
 
 
-# Main function to run the simulation and plot results
 if __name__ == "__main__":
-    # Run simulation
-    num_simulations = 1000
-    results = monte_carlo_simulation(num_simulations)
-
-    # Print results
-    print(f"Results after {num_simulations} simulations:")
-    print(f"Player wins: {results['Player']}")
-    print(f"Computer wins: {results['Computer']}")
-    print(f"Ties: {results['Tie']}")
-
-    # Plot results
-    plot_results(results, chart_type="bar")  # Change to "pie" for a pie chart
\ No newline at end of file
+    main()
@@ -1,150 +1,339 @@
-from flask import Flask, render_template, request, redirect, url_for, session
+import atexit
+import json
+import os
 import random
+import re
+import secrets
+from functools import lru_cache
+from flask import Flask, Response, jsonify, render_template, request, redirect, url_for, session
+from cards import (DECK_SIZE, EMPTY_HAND, RANKS, SUITS, SUIT_SYMBOLS, Hand, Shoe, add_card, card_rank, card_suit,
+                   state_value)
+from game_store import make_store
+from metrics import init_app as init_metrics
+from rules import RULE_SETS, compile_rules
 
 app = Flask(__name__)
 app.secret_key = 'your_secret_key'  # Required for session management
 
-def initialize_deck():
-    cardsuits = ['Spades', 'Clubs', 'Hearts', 'Diamonds']
-    cardtypes = ['A', 2, 3, 4, 5, 6, 7, 8, 9, 10, 'J', 'Q', 'K']
-    return [f"{card} of {suit}" for suit in cardsuits for card in cardtypes]
-
-def evaluate_hand(hand):
-    values = {'J': 10, 'Q': 10, 'K': 10}
-    hand_value = 0
-    aces = 0
-
-    for card in hand:
-        rank = card.split()[0]
-        if rank == 'A':
-            aces += 1
-        elif rank in values:
-            hand_value += values[rank]
-        else:
-            hand_value += int(rank)
+# Game state lives server-side; the session cookie only carries the game's id
+store = make_store(os.environ.get('BLACKJACK_GAME_STORE', 'memory'))
 
-    for _ in range(aces):
-        if hand_value + 11 <= 21:
-            hand_value += 11
-        else:
-            hand_value += 1
+# Opt-in request metrics at /metrics and sampled profiling (see metrics.py)
+metrics = init_metrics(app)
+
+# The web game's rules, compiled once; the dealer's draws are looked up by hand state
+RULES = compile_rules(RULE_SETS[os.environ.get('BLACKJACK_RULES', 'classic')])
+
+# With BLACKJACK_DEALER_PLAY=full, standing plays out the dealer's whole hand in one
+# request; by default the dealer draws one card per stand
+DEALER_PLAYS_OUT = os.environ.get('BLACKJACK_DEALER_PLAY', 'step') == 'full'
+
+# Opt-in hand history: finished games are appended to this hand log (see hand_log.py)
+hand_log = None
+if os.environ.get('BLACKJACK_HAND_LOG'):
+    from hand_log import HandLog
+    hand_log = HandLog(os.environ['BLACKJACK_HAND_LOG'], buffer_records=256)
+    atexit.register(hand_log.close)
+
+# Shuffles kept in memory, so a game's draws don't reshuffle its deck
+DECK_CACHE_SIZE = 4096
+
+def initialize_deck(seed):
+    """Creates the shuffled deck for a seed; replaying the seed recreates the same order."""
+    return Shoe(rng=random.Random(seed))
 
-    return hand_value
+@lru_cache(maxsize=DECK_CACHE_SIZE)
+def shuffled_deck(seed):
+    """The card order of a seed's deck, as bytes, shuffled once per seed while it stays cached."""
+    return initialize_deck(seed).to_bytes()
+
+def _card_key(card):
+    """Art key of a card int, e.g. 'sa' for the Ace of Spades."""
+    return f"{SUITS[card_suit(card)][0].lower()}{RANKS[card_rank(card)].lower()}"
+
+def load_card_art():
+    """Maps card keys ('sa', 'h10', 'back', ...) to their art, and returns the sprite CSS URL.
+
+    Uses the optimized assets from build_assets.py when they have been built, and
+    the original images in static/assets/images otherwise.
+    """
+    manifest_path = os.path.join(app.static_folder, 'build', 'manifest.json')
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        art = {key: {'image': files['webp'], 'image_avif': files.get('avif'), 'sprite': manifest['sprite'][key]}
+               for key, files in manifest['cards'].items()}
+        return art, manifest['css']
+
+    art = {}
+    for filename in os.listdir(os.path.join(app.static_folder, 'assets', 'images')):
+        key = os.path.splitext(filename)[0].lower()
+        art[key] = {'image': f"/static/assets/images/{filename}", 'image_avif': None, 'sprite': None}
+    return art, None
+
+# Card art and display labels, computed once per card
+CARD_ART, CARD_CSS = load_card_art()
+NO_ART = {'image': None, 'image_avif': None, 'sprite': None}
+CARD_IMAGES = tuple(CARD_ART.get(_card_key(card), NO_ART) for card in range(DECK_SIZE))
+CARD_DISPLAYS = tuple(f"{RANKS[card_rank(card)]}{SUIT_SYMBOLS[card_suit(card)]}\ufe0f" for card in range(DECK_SIZE))
 
 def card_to_image(card):
-    """Converts a card name (e.g., '5 of Diamonds') to an image filename (e.g., 'd5.png')."""
-    rank, suit = card.split(' of ')
-    suit_map = {'Spades': 's', 'Clubs': 'c', 'Hearts': 'h', 'Diamonds': 'd'}
-    rank_map = {'A': 'a', 'J': 'j', 'Q': 'q', 'K': 'k'}
-    
-    # Convert rank to lowercase and handle face cards
-    rank = rank_map.get(rank, rank.lower())
-    
-    # Convert suit to lowercase and map to single letter
-    suit = suit_map.get(suit, suit[0].lower())
-    
-    return f"{suit}{rank}.png"
+    """Converts a card int to the URL of its image, or None if the card has no art."""
+    return CARD_IMAGES[card]['image']
 
 def card_to_display(card):
-    """Converts a card name to display format with emoji (e.g., 'A♠️', '5♦️')."""
-    rank, suit = card.split(' of ')
-    suit_emoji = {'Spades': '♠️', 'Clubs': '♣️', 'Hearts': '♥️', 'Diamonds': '♦️'}
-    
-    return f"{rank}{suit_emoji[suit]}"
+    """Converts a card int to display format with emoji (e.g., 'A♠️', '5♦️')."""
+    return CARD_DISPLAYS[card]
 
-@app.route('/')
-def index():
-    if 'deck' not in session:
-        session['deck'] = initialize_deck()
-        session['player_hand'] = []
-        session['computer_hand'] = []
-        session['player_score'] = 0
-        session['computer_score'] = 0
-        session['game_over'] = False
-
-        # Draw initial hands
-        for _ in range(2):
-            session['player_hand'].append(random.choice(session['deck']))
-            session['deck'].remove(session['player_hand'][-1])
-            session['computer_hand'].append(random.choice(session['deck']))
-            session['deck'].remove(session['computer_hand'][-1])
-
-        session['player_score'] = evaluate_hand(session['player_hand'])
-        session['computer_score'] = evaluate_hand(session['computer_hand'])
-
-        # Check for natural blackjack
-        if session['player_score'] == 21:
-            session['game_over'] = True
-            session['message'] = "Player has a natural Blackjack! You win!"
-        elif session['computer_score'] == 21:
-            session['game_over'] = True
-            session['message'] = "Computer has a natural Blackjack! Computer wins!"
-
-    # Convert card names to image paths and display names
-    player_cards = [{'image': card_to_image(card), 'display': card_to_display(card)} 
-                    for card in session['player_hand']]
-    
-    # Only show the first card of the computer's hand initially
-    if session['game_over']:
-        computer_cards = [{'image': card_to_image(card), 'display': card_to_display(card)} 
-                         for card in session['computer_hand']]
+def load_game():
+    """Returns the session's game from the store, or None if it has none (or it expired)."""
+    sid = session.get('sid')
+    return None if sid is None else store.get(sid)
+
+def game_outcome(game):
+    """The winner of a finished game: 'Player', 'Computer' or 'Tie'."""
+    player, computer = game['player_score'], game['computer_score']
+    if player > 21:
+        return 'Computer'
+    if player == 21 or computer > 21:
+        return 'Player'
+    if player == computer:
+        return 'Tie'
+    return 'Player' if player > computer else 'Computer'
+
+def save_game(game):
+    if hand_log is not None and game['game_over'] and not game.get('logged'):
+        outcome = game_outcome(game)
+        hand_log.append(game['player_hand'], game['computer_hand'], ('Player', 'Computer', 'Tie').index(outcome),
+                        seed=game['seed'])
+        game['logged'] = True
+    if metrics is not None:
+        metrics.game_size.observe(len(json.dumps(game)))
+    store.put(session['sid'], game)
+
+def draw_card(game):
+    """Deals the card at the game's cursor from its seed's deck and advances the cursor."""
+    cursor = game['cursor']
+    game['cursor'] = cursor + 1
+    return shuffled_deck(game['seed'])[cursor]
+
+def new_game():
+    # The deck is stored as its seed and a cursor; the shuffle itself is cached (see shuffled_deck)
+    game = {'seed': secrets.randbits(64), 'cursor': 0, 'game_over': False, 'message': ''}
+
+    # Draw initial hands
+    player_hand = Hand()
+    computer_hand = Hand()
+    for _ in range(2):
+        player_hand.add(draw_card(game))
+        computer_hand.add(draw_card(game))
+    game['player_hand'] = list(player_hand)
+    game['computer_hand'] = list(computer_hand)
+
+    # Hand states let later cards update the scores without re-evaluating
+    game['player_state'] = player_hand.state
+    game['computer_state'] = computer_hand.state
+    game['player_score'] = player_hand.value()
+    game['computer_score'] = computer_hand.value()
+
+    # Check for natural blackjack
+    if game['player_score'] == 21:
+        game['game_over'] = True
+        game['message'] = "Player has a natural Blackjack! You win!"
+    elif game['computer_score'] == 21:
+        game['game_over'] = True
+        game['message'] = "Computer has a natural Blackjack! Computer wins!"
+
+    return game
+
+def player_hit(game):
+    """Deals the player a card and settles the game if it ends it."""
+    card = draw_card(game)
+    game['player_hand'].append(card)
+    game['player_state'] = add_card(game['player_state'], card)
+    game['player_score'] = state_value(game['player_state'])
+
+    if game['player_score'] > 21:
+        game['game_over'] = True
+        game['message'] = "You busted! Computer wins."
+    elif game['player_score'] == 21:
+        game['game_over'] = True
+        game['message'] = "You got 21! You win!"
+
+def computer_draw(game):
+    """Deals the computer a card and settles the game if the computer busts or stands."""
+    card = draw_card(game)
+    game['computer_hand'].append(card)
+    game['computer_state'] = add_card(game['computer_state'], card)
+    game['computer_score'] = state_value(game['computer_state'])
+
+    # Check if computer busts after drawing a card
+    if game['computer_score'] > 21:
+        game['game_over'] = True
+        game['message'] = "Computer busted! You win!"
     else:
-        computer_cards = [
-            {'image': card_to_image(session['computer_hand'][0]), 
-             'display': card_to_display(session['computer_hand'][0])},
-            {'image': 'back.png', 'display': '?'}
-        ]
+        # If the rules have the computer hit this hand, it will draw again in the next stand
+        if RULES.dealer_hits[game['computer_state']]:
+            game['message'] = "Computer draws another card. Your turn again."
+        else:
+            # Otherwise the computer stands
+            computer_stands(game)
 
-    return render_template('index.html', player_cards=player_cards, computer_cards=computer_cards)
+def computer_stands(game):
+    """Ends the game by comparing the scores."""
+    game['game_over'] = True
+    if game['player_score'] > game['computer_score']:
+        game['message'] = "You win!"
+    elif game['player_score'] < game['computer_score']:
+        game['message'] = "Computer wins!"
+    else:
+        game['message'] = "It's a tie!"
+
+def dealer_play(game):
+    """Draws the computer's cards while the rules have it hit, then settles the game."""
+    while not game['game_over'] and RULES.dealer_hits[game['computer_state']]:
+        computer_draw(game)
+    if not game['game_over']:
+        computer_stands(game)
+
+def stand_action(game):
+    if DEALER_PLAYS_OUT:
+        dealer_play(game)
+    else:
+        computer_draw(game)
+
+def card_view(card):
+    return {**CARD_IMAGES[card], 'display': card_to_display(card)}
+
+HIDDEN_CARD = {**CARD_ART.get('back', NO_ART), 'display': '?'}
+
+def game_view(game):
+    """What the player may see of a game: all their cards, and the computer's upcard until it ends."""
+    # Only show the first card of the computer's hand until the game is over
+    if game['game_over']:
+        computer_cards = [card_view(card) for card in game['computer_hand']]
+    else:
+        computer_cards = [card_view(game['computer_hand'][0]), HIDDEN_CARD]
+
+    return {
+        'player_cards': [card_view(card) for card in game['player_hand']],
+        'computer_cards': computer_cards,
+        'player_score': game['player_score'],
+        'computer_score': game['computer_score'] if game['game_over'] else None,
+        'game_over': game['game_over'],
+        'message': game['message'],
+    }
+
+def load_or_start_game():
+    game = load_game()
+    if game is None:
+        session['sid'] = secrets.token_urlsafe(12)
+        game = new_game()
+        save_game(game)
+    return game
+
+@app.route('/')
+def index():
+    view = game_view(load_or_start_game())
+    return render_template('index.html', game=view, player_cards=view['player_cards'],
+                           computer_cards=view['computer_cards'], card_css=CARD_CSS, stream_stand=DEALER_PLAYS_OUT)
 
 @app.route('/hit', methods=['POST'])
 def hit():
-    if not session['game_over']:
-        session['player_hand'].append(random.choice(session['deck']))
-        session['deck'].remove(session['player_hand'][-1])
-        session['player_score'] = evaluate_hand(session['player_hand'])
-
-        if session['player_score'] > 21:
-            session['game_over'] = True
-            session['message'] = "You busted! Computer wins."
-        elif session['player_score'] == 21:
-            session['game_over'] = True
-            session['message'] = "You got 21! You win!"
+    game = load_game()
+    if game is not None and not game['game_over']:
+        player_hit(game)
+        save_game(game)
 
     return redirect(url_for('index'))
 
 @app.route('/stand', methods=['POST'])
 def stand():
-    if not session['game_over']:
-        # Computer draws one card
-        session['computer_hand'].append(random.choice(session['deck']))
-        session['deck'].remove(session['computer_hand'][-1])
-        session['computer_score'] = evaluate_hand(session['computer_hand'])
-
-        # Check if computer busts after drawing a card
-        if session['computer_score'] > 21:
-            session['game_over'] = True
-            session['message'] = "Computer busted! You win!"
-        else:
-            # If computer's score is less than 17, it will draw again in the next stand
-            if session['computer_score'] < 17:
-                session['message'] = "Computer draws another card. Your turn again."
-            else:
-                # If computer's score is 17 or higher, it stands
-                session['game_over'] = True
-                if session['player_score'] > session['computer_score']:
-                    session['message'] = "You win!"
-                elif session['player_score'] < session['computer_score']:
-                    session['message'] = "Computer wins!"
-                else:
-                    session['message'] = "It's a tie!"
+    game = load_game()
+    if game is not None and not game['game_over']:
+        stand_action(game)
+        save_game(game)
 
     return redirect(url_for('index'))
 
+def sse_event(name, data):
+    return f"event: {name}\ndata: {json.dumps(data)}\n\n"
+
+@app.route('/stand/events')
+def stand_events():
+    """Server-sent events: stands, plays out the dealer's hand, and streams each of its cards.
+
+    One "card" event per card after the upcard (the hole card, then each draw),
+    with the dealer's score so far, and a last "result" event. A game that is
+    already over is replayed rather than played again, so a reconnecting
+    EventSource sees the same cards. Only served in full dealer play: in step
+    mode a GET, even a prefetch, must not play out the dealer's hand.
+    """
+    if not DEALER_PLAYS_OUT:
+        return '', 404
+    game = load_game()
+    if game is None:
+        return '', 204  # Tells EventSource not to reconnect
+    if not game['game_over']:
+        dealer_play(game)
+        save_game(game)
+
+    events = []
+    state = EMPTY_HAND
+    for index, card in enumerate(game['computer_hand']):
+        state = add_card(state, card)
+        if index:
+            events.append(sse_event('card', {'index': index, 'card': card_view(card),
+                                             'computer_score': state_value(state)}))
+    events.append(sse_event('result', {'computer_score': game['computer_score'], 'message': game['message']}))
+    return Response(events, content_type='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
 @app.route('/reset', methods=['POST'])
 def reset():
+    if 'sid' in session:
+        store.delete(session['sid'])
     session.clear()
     return redirect(url_for('index'))
 
+# Built assets have content-hashed names, so browsers may cache them forever
+HASHED_ASSET = re.compile(r'^/static/build/.+\.[0-9a-f]{12}\.\w+$')
+
+@app.after_request
+def cache_hashed_assets(response):
+    if response.status_code == 200 and HASHED_ASSET.match(request.path):
+        response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response
+
+# JSON API: one round trip per action, answering with only what changed
+@app.route('/api/game')
+def api_game():
+    return jsonify(card_css=CARD_CSS, **game_view(load_or_start_game()))
+
+def api_action(action):
+    game = load_game()
+    if game is None:
+        return jsonify(error="No game in progress. GET /api/game to start one."), 404
+    before = game_view(game)
+    if not game['game_over']:
+        action(game)
+        save_game(game)
+    return jsonify({key: value for key, value in game_view(game).items() if before[key] != value})
+
+@app.route('/api/hit', methods=['POST'])
+def api_hit():
+    return api_action(player_hit)
+
+@app.route('/api/stand', methods=['POST'])
+def api_stand():
+    return api_action(stand_action)
+
+@app.route('/api/reset', methods=['POST'])
+def api_reset():
+    if 'sid' in session:
+        store.delete(session['sid'])
+    session.clear()
+    return jsonify(game_view(load_or_start_game()))
+
 if __name__ == '__main__':
     app.run(debug=True)
\ No newline at end of file
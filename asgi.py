@@ -0,0 +1,14 @@
+"""ASGI entry point for serving the web game from an async server.
+
+    pip install -r requirements.txt uvicorn
+    uvicorn asgi:asgi_app --workers 4
+
+Requests run in the server's thread pool while the event loop keeps idle
+connections cheap, so one process can serve thousands of open tables.
+Use BLACKJACK_GAME_STORE=sqlite:<path> so all workers share the same games.
+"""
+from asgiref.wsgi import WsgiToAsgi
+
+from app import app
+
+asgi_app = WsgiToAsgi(app)
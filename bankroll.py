@@ -0,0 +1,204 @@
+"""Bankroll trajectories: risk of ruin and drawdowns over long horizons.
+
+Thousands of bankrolls are evolved side by side as rows of NumPy arrays, each hand
+a draw from the simulator's per-hand payout distribution. Hands are played in
+chunks, and only each path's balance, peak and ruin hand are carried between
+chunks; bankroll and drawdown quantiles are kept in fixed-width histograms
+(QuantileSketch), so memory does not grow with the horizon.
+
+    payouts = batch_engine.play_batch(1_000_000, rng, policy, rules)
+    report = simulate_bankrolls(payout_distribution(payouts), num_hands=1_000_000, bankroll=200)
+"""
+import numpy as np
+
+QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+NOT_RUINED = -1
+
+
+class QuantileSketch:
+    """Approximate quantiles of a stream of values, from a histogram of fixed-width bins.
+
+    Bins are centered on multiples of width. Memory is one count per bin across
+    the range seen so far, however many values are added. Quantiles are exact to
+    within half a bin width, and exact for values on the grid, such as the balances
+    of flat one-bet paths. Sketches with the same width can be merged.
+    """
+    __slots__ = ('width', 'offset', 'counts')
+
+    def __init__(self, width=1.0):
+        if width <= 0:
+            raise ValueError(f"Bin width must be positive, got {width}.")
+        self.width = width
+        self.offset = 0  # Bin number of counts[0]
+        self.counts = np.zeros(0, dtype=np.int64)
+
+    @property
+    def count(self):
+        return int(self.counts.sum())
+
+    def _add_counts(self, first_bin, counts):
+        if not self.counts.size:
+            self.offset = first_bin
+        low = min(self.offset, first_bin)
+        high = max(self.offset + self.counts.size, first_bin + counts.size)
+        if low != self.offset or high != self.offset + self.counts.size:
+            grown = np.zeros(high - low, dtype=np.int64)
+            grown[self.offset - low:self.offset - low + self.counts.size] = self.counts
+            self.counts, self.offset = grown, low
+        self.counts[first_bin - self.offset:first_bin - self.offset + counts.size] += counts
+
+    def add(self, values):
+        values = np.asarray(values, dtype=np.float64).ravel()
+        if not values.size:
+            return
+        bins = np.floor(values / self.width + 0.5).astype(np.int64)
+        first_bin = int(bins.min())
+        self._add_counts(first_bin, np.bincount(bins - first_bin))
+
+    def merge(self, other):
+        if other.width != self.width:
+            raise ValueError("Only sketches with the same bin width can be merged.")
+        if other.counts.size:
+            self._add_counts(other.offset, other.counts)
+
+    def quantiles(self, qs=QUANTILES):
+        """Returns {q: value} for each q: the center of the bin holding that quantile."""
+        total = self.count
+        if not total:
+            return {q: float("nan") for q in qs}
+        cumulative = np.cumsum(self.counts)
+        result = {}
+        for q in qs:
+            rank = q * total
+            index = min(int(np.searchsorted(cumulative, rank, side="left")), self.counts.size - 1)
+            result[q] = float((self.offset + index) * self.width)
+        return result
+
+
+def payout_distribution(payouts):
+    """Returns (values, probabilities) of per-hand payouts, e.g. from batch_engine.play_batch."""
+    values, counts = np.unique(np.asarray(payouts, dtype=np.float64), return_counts=True)
+    return values, counts / counts.sum()
+
+
+def results_distribution(results):
+    """Returns (values, probabilities) from monte_carlo_simulation's Player/Computer/Tie counts.
+
+    Every round pays +1, -1 or 0 units, as under play_blackjack's rules.
+    """
+    counts = np.array([results["Computer"], results["Tie"], results["Player"]], dtype=np.float64)
+    return np.array([-1.0, 0.0, 1.0]), counts / counts.sum()
+
+
+def _evolve(deltas, balance, peak, max_drawdown, ruin_hand, hands_done, floor):
+    """Plays a chunk of hands, deltas[path, hand], onto the paths' state arrays in place.
+
+    A path is ruined once its balance drops below floor; it stops betting from then
+    on. Returns the balance after every hand of the chunk.
+    """
+    deltas[ruin_hand != NOT_RUINED] = 0
+    balances = np.cumsum(deltas, axis=1)
+    balances += balance[:, None]
+
+    below = balances < floor
+    ruined = below.any(axis=1) & (ruin_hand == NOT_RUINED)
+    if ruined.any():
+        rows = np.flatnonzero(ruined)
+        first = below[rows].argmax(axis=1)
+        ruin_hand[rows] = hands_done + first + 1
+        after = np.arange(balances.shape[1]) >= first[:, None]
+        balances[rows] = np.where(after, balances[rows, first][:, None], balances[rows])
+
+    peaks = np.maximum.accumulate(balances, axis=1)
+    np.maximum(peaks, peak[:, None], out=peaks)
+    np.maximum(max_drawdown, (peaks - balances).max(axis=1), out=max_drawdown)
+    peak[:] = peaks[:, -1]
+    balance[:] = balances[:, -1]
+    return balances
+
+
+def simulate_bankrolls(distribution, num_paths=10_000, num_hands=100_000, bankroll=100.0, bet=1.0,
+                       rng=None, checkpoints=None, quantiles=QUANTILES, chunk_size=4_000_000,
+                       batch_paths=10_000, resolution=None):
+    """Evolves num_paths bankrolls over num_hands hands of flat bets and reports their risk.
+
+    distribution is (values, probabilities) of the payout of a one-unit bet (see
+    payout_distribution); every hand of every path is drawn from it independently.
+    A path is ruined when its bankroll drops below one bet, and stops playing.
+    checkpoints are the hand numbers to report bankroll quantiles and ruin
+    probability at (ten evenly spaced by default, always including num_hands).
+
+    Paths are played batch_paths at a time, in chunks of about chunk_size hands
+    across the batch. Quantiles come from QuantileSketch histograms with bins of
+    resolution units (one bet by default). Returns a dict with the ruin
+    probability, the mean ruin hand of ruined paths, the final bankroll's mean and
+    quantiles, the max drawdown's mean and quantiles, and per checkpoint the ruin
+    probability and bankroll quantiles.
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+    values, probabilities = (np.asarray(array, dtype=np.float64) for array in distribution)
+    if values.shape != probabilities.shape or not values.size:
+        raise ValueError("distribution must be matching non-empty arrays of values and probabilities.")
+    if bankroll < bet or bet <= 0:
+        raise ValueError(f"Need a positive bet no larger than the bankroll, got bet {bet}, bankroll {bankroll}.")
+    if checkpoints is None:
+        checkpoints = np.linspace(0, num_hands, 11)[1:]
+    checkpoints = sorted({int(hand) for hand in checkpoints if 0 < hand <= num_hands} | {num_hands})
+    width = bet if resolution is None else resolution
+    cumulative = np.cumsum(probabilities / probabilities.sum())
+    steps = values * bet
+
+    ruined_by = np.zeros(len(checkpoints), dtype=np.int64)
+    balance_sketches = [QuantileSketch(width) for _ in checkpoints]
+    drawdown_sketch = QuantileSketch(width)
+    ruin_hands = ruined_total = 0
+    final_total = drawdown_total = 0.0
+
+    for batch_start in range(0, num_paths, batch_paths):
+        paths = min(batch_paths, num_paths - batch_start)
+        balance = np.full(paths, float(bankroll))
+        peak = balance.copy()
+        max_drawdown = np.zeros(paths)
+        ruin_hand = np.full(paths, NOT_RUINED, dtype=np.int64)
+        chunk = max(1, chunk_size // paths)
+
+        for hands_done in range(0, num_hands, chunk):
+            size = min(chunk, num_hands - hands_done)
+            index = np.searchsorted(cumulative, rng.random((paths, size)), side="right")
+            deltas = steps[np.minimum(index, steps.size - 1)]
+            balances = _evolve(deltas, balance, peak, max_drawdown, ruin_hand, hands_done, bet)
+            for i, hand in enumerate(checkpoints):
+                if hands_done < hand <= hands_done + size:
+                    balance_sketches[i].add(balances[:, hand - hands_done - 1])
+            if (ruin_hand != NOT_RUINED).all():
+                # Every path has stopped; the rest of the horizon leaves them as they are
+                for i, hand in enumerate(checkpoints):
+                    if hand > hands_done + size:
+                        balance_sketches[i].add(balance)
+                break
+
+        ruined = ruin_hand != NOT_RUINED
+        ruined_total += int(ruined.sum())
+        ruin_hands += int(ruin_hand[ruined].sum())
+        ruined_by += (ruin_hand[ruined][:, None] <= np.array(checkpoints)).sum(axis=0)
+        final_total += balance.sum()
+        drawdown_total += max_drawdown.sum()
+        drawdown_sketch.add(max_drawdown)
+
+    return {
+        "paths": num_paths,
+        "hands": num_hands,
+        "bankroll": bankroll,
+        "bet": bet,
+        "ruin_probability": ruined_total / num_paths,
+        "mean_ruin_hand": ruin_hands / ruined_total if ruined_total else None,
+        "final_mean": final_total / num_paths,
+        "final_quantiles": balance_sketches[-1].quantiles(quantiles),
+        "max_drawdown_mean": drawdown_total / num_paths,
+        "max_drawdown_quantiles": drawdown_sketch.quantiles(quantiles),
+        "checkpoints": {
+            hand: {"ruin_probability": int(ruined) / num_paths, "quantiles": sketch.quantiles(quantiles)}
+            for hand, ruined, sketch in zip(checkpoints, ruined_by, balance_sketches)
+        },
+    }
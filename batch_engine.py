@@ -0,0 +1,408 @@
+"""Vectorized NumPy engine that plays many rounds of Simulation.py's Blackjack at once.
+
+Rules come from a RuleSet (see rules.py), compiled once into arrays, so the rounds
+are played with table lookups rather than tests of rule flags.
+"""
+from functools import lru_cache
+
+import numpy as np
+
+import cards
+from rules import BUST, CLASSIC, DOUBLE, HIT, PLAY_ON, SPLIT, STAND, SURRENDER, WIN, compile_rules
+from strategy import NUM_UPCARDS, POLICY_SHAPE, threshold_policy
+
+OUTCOMES = ("Player", "Computer", "Tie")
+PLAYER, COMPUTER, TIE = range(3)
+
+# Blackjack value of every card int in a deck, with Aces counted as 1
+DECK_VALUES = np.frombuffer(cards.CARD_VALUES[:cards.DECK_SIZE], dtype=np.int8)
+NUM_RANKS = 13
+RANK_VALUES = DECK_VALUES[:NUM_RANKS]  # Value of each rank, Ace first
+DEFAULT_POLICY = threshold_policy(17)
+
+
+def new_decks(num_rows, num_decks=1):
+    """Returns a (num_rows, num_decks * 52) matrix of card values, one unshuffled shoe per row."""
+    return np.tile(DECK_VALUES, (num_rows, num_decks))
+
+
+def draw(decks, rows, pointer, rng, shoe_size=None):
+    """Draws a random undealt card from each of the given rows and advances their pointers.
+
+    This is a lazy Fisher-Yates shuffle: the card is picked uniformly from the undealt
+    tail of the row and swapped into the dealt prefix, so only dealt cards are shuffled.
+    With shoe_size, only the first shoe_size cards of a row are dealt from until they
+    run out; the rest of the row is a spare shoe to finish the round with.
+    """
+    position = pointer[rows]
+    end = decks.shape[1]
+    if shoe_size is not None:
+        end = np.where(position < shoe_size, shoe_size, end)
+    pick = rng.integers(position, end)
+    card = decks[rows, pick]
+    decks[rows, pick] = decks[rows, position]
+    decks[rows, position] = card
+    pointer[rows] = position + 1
+    return card
+
+
+def shuffled_ranks(num_rows, rng, upcards=None, num_decks=1):
+    """Returns a (num_rows, num_decks * 52) matrix of card ranks (0 for Aces up to 12), one shuffled shoe per row.
+
+    With upcards, each row's second card, the dealer's upcard in a one-seat round,
+    is of rank upcards[row], and the rest of the shoe is shuffled around it.
+    """
+    ranks = np.tile(np.arange(NUM_RANKS, dtype=np.int8), (num_rows, 4 * num_decks))
+    if upcards is None:
+        return rng.permuted(ranks, axis=1)
+    # Column r of the first suit holds rank r: swap the upcard to the front and shuffle the rest
+    rows = np.arange(num_rows)
+    ranks[rows, upcards] = 0
+    ranks[:, 0] = upcards
+    rest = rng.permuted(ranks[:, 1:], axis=1)
+    return np.concatenate([rest[:, :1], ranks[:, :1], rest[:, 1:]], axis=1)
+
+
+def mirror_ranks(ranks):
+    """The antithetic shoe of each row: every rank swapped for its mirror (A for K, 2 for Q, ... 7 for 7).
+
+    It is as random a shuffle as the original, but deals high cards where the
+    original dealt low ones.
+    """
+    return NUM_RANKS - 1 - ranks
+
+
+def play_ranks(ranks, policy=None, rules=CLASSIC):
+    """Plays one round from each row of ranks (see shuffled_ranks), dealing its cards in order; returns the net payouts."""
+    values = RANK_VALUES[ranks]
+    pointer = np.zeros(len(values), dtype=np.intp)
+
+    def deal(rows):
+        card = values[rows, pointer[rows]]
+        pointer[rows] += 1
+        return card
+
+    return play_round(deal, len(values), [policy or DEFAULT_POLICY], rules)[0]
+
+
+def hand_value(hard, aces):
+    """Vectorized cards.evaluate_hand, computed from the hard total (Aces as 1) and Ace count."""
+    # One Ace counts as 11 if that doesn't bust the hand
+    return np.where((aces > 0) & (hard <= 11), hard + 10, hard)
+
+
+def policy_table(policy):
+    """Returns a Policy's hit/stand table as a boolean array indexed by [total, soft, upcard]."""
+    return np.frombuffer(policy.hits, dtype=bool).reshape(POLICY_SHAPE)
+
+
+def action_table(policy):
+    """Returns a Policy's first-decision actions as a uint8 array indexed by [total, soft, upcard]."""
+    return np.frombuffer(policy.actions, dtype=np.uint8).reshape(POLICY_SHAPE)
+
+
+def split_table(policy):
+    """Returns a Policy's split table as a boolean array indexed by [pair value, upcard]."""
+    return np.frombuffer(policy.splits, dtype=bool).reshape(NUM_UPCARDS, NUM_UPCARDS)
+
+
+@lru_cache(maxsize=None)
+def rule_arrays(rules=CLASSIC):
+    """Returns (tables, dealer_hits, hand_end, can_double, can_double_split) for a RuleSet.
+
+    tables is its RuleTables; the others are its state-indexed tables re-indexed
+    by [value, soft] (hand_end by value) as NumPy arrays.
+    """
+    tables = compile_rules(rules)
+    shape = POLICY_SHAPE[:2]
+    dealer_hits = np.zeros(shape, dtype=bool)
+    can_double = np.zeros(shape, dtype=bool)
+    can_double_split = np.zeros(shape, dtype=bool)
+    for state in range(cards.NUM_STATES):
+        cell = cards.STATE_VALUES[state], int(cards.STATE_SOFT[state])
+        dealer_hits[cell] = tables.dealer_hits[state]
+        can_double[cell] = tables.can_double[state]
+        can_double_split[cell] = tables.can_double_split[state]
+    hand_end = np.frombuffer(tables.hand_end, dtype=np.uint8)
+    return tables, dealer_hits, hand_end, can_double, can_double_split
+
+
+DEALER_HITS = rule_arrays(CLASSIC)[1]
+
+
+def soft_flag(hard, aces):
+    """1 where the hand's value counts an Ace as 11, else 0."""
+    return ((aces > 0) & (hard <= 11)).astype(np.intp)
+
+
+def player_turn(deal, hard, aces, active, upcard, hits):
+    """Deals cards to every active row while the hit table says hit; returns the final scores.
+
+    deal(rows) returns the next card for each of the given rows; hard and aces are
+    updated in place.
+    """
+    score = hand_value(hard, aces)
+    rows = np.flatnonzero(active & hits[score, soft_flag(hard, aces), upcard])
+    while rows.size:
+        card = deal(rows)
+        hard[rows] += card
+        aces[rows] += card == 1
+        row_hard = hard[rows]
+        row_aces = aces[rows]
+        row_score = hand_value(row_hard, row_aces)
+        score[rows] = row_score
+        rows = rows[hits[row_score, soft_flag(row_hard, row_aces), upcard[rows]]]
+    return score
+
+
+def dealer_turn(deal, hard, aces, active, hits=DEALER_HITS):
+    """Deals cards to every active row while the dealer's [value, soft] hit table says hit; returns the final scores.
+
+    The default table draws to 17 and stands on any 17.
+    """
+    score = hand_value(hard, aces)
+    rows = np.flatnonzero(active & hits[score, soft_flag(hard, aces)])
+    while rows.size:
+        card = deal(rows)
+        hard[rows] += card
+        aces[rows] += card == 1
+        row_hard = hard[rows]
+        row_aces = aces[rows]
+        row_score = hand_value(row_hard, row_aces)
+        score[rows] = row_score
+        rows = rows[hits[row_score, soft_flag(row_hard, row_aces)]]
+    return score
+
+
+def _play_hands(deal, hard, aces, first, upcard, live, policy, arrays):
+    """Plays one seat's hand, and any hands split from it, at every live row.
+
+    first is the value of the hand's first card. Returns (net, bets, scores, first_action):
+    the units already settled (surrenders, busts and outright wins), per hand
+    slot the bet still waiting on the dealer and the hand's final score, and the
+    seat's first action (SPLIT if it split; STAND for rows that weren't live).
+    """
+    tables, _, hand_end, can_double, can_double_split = arrays
+    hits = policy_table(policy)
+    actions = action_table(policy)
+    splits = split_table(policy)
+    max_hands = tables.max_hands
+    num_rows = hard.size
+
+    slot_hard = np.zeros((max_hands, num_rows), dtype=np.int16)
+    slot_aces = np.zeros((max_hands, num_rows), dtype=np.int16)
+    slot_first = np.zeros((max_hands, num_rows), dtype=np.int16)
+    slot_hard[0], slot_aces[0], slot_first[0] = hard, aces, first
+    bets = np.zeros((max_hands, num_rows))
+    bets[0] = live
+    scores = np.zeros((max_hands, num_rows), dtype=np.int16)
+    num_hands = live.astype(np.intp)
+    was_split = np.zeros(num_rows, dtype=bool)
+    first_action = np.full(num_rows, STAND, dtype=np.uint8)
+    net = np.zeros(num_rows)
+
+    for slot in range(max_hands):
+        rows = np.flatnonzero(num_hands > slot)
+        if not rows.size:
+            break
+        hand_hard, hand_aces = slot_hard[slot], slot_aces[slot]
+        if slot:
+            # A hand split off earlier gets its second card when its turn comes
+            card = deal(rows)
+            hand_hard[rows] += card
+            hand_aces[rows] += card == 1
+
+        # Split pairs while the policy says so and the rules allow another hand
+        splitting = rows
+        while max_hands > 1 and splitting.size:
+            value = slot_first[slot, splitting]
+            splitting = splitting[(hand_hard[splitting] == 2 * value) & (num_hands[splitting] < max_hands)
+                                  & splits[value, upcard[splitting]]]
+            if not splitting.size:
+                break
+            value = slot_first[slot, splitting]
+            new = num_hands[splitting]
+            slot_hard[new, splitting] = value
+            slot_aces[new, splitting] = value == 1
+            slot_first[new, splitting] = value
+            bets[new, splitting] = bets[slot, splitting]
+            num_hands[splitting] += 1
+            was_split[splitting] = True
+            card = deal(splitting)
+            hand_hard[splitting] = value + card
+            hand_aces[splitting] = (value == 1).astype(np.int16) + (card == 1)
+
+        # The first decision, falling back to hit/stand where the rules forbid the action
+        score = hand_value(hand_hard[rows], hand_aces[rows])
+        soft = soft_flag(hand_hard[rows], hand_aces[rows])
+        up = upcard[rows]
+        split_hand = was_split[rows]
+        action = actions[score, soft, up]
+        allowed = np.where(action == DOUBLE, np.where(split_hand, can_double_split[score, soft], can_double[score, soft]),
+                           (action != SURRENDER) | (tables.surrender & ~split_hand))
+        action = np.where(allowed, action, hits[score, soft, up].astype(np.uint8))
+        locked = split_hand & (slot_first[slot, rows] == 1) & tables.split_aces_one_card
+        action[locked | (hand_end[score] != PLAY_ON)] = STAND
+        if not slot:
+            first_action[rows] = np.where(split_hand, SPLIT, action)
+
+        surrender = rows[action == SURRENDER]
+        net[surrender] -= 0.5 * bets[slot, surrender]
+        bets[slot, surrender] = 0
+        doubling = rows[action == DOUBLE]
+        bets[slot, doubling] *= 2
+        drawing = rows[(action == DOUBLE) | (action == HIT)]
+        if drawing.size:
+            card = deal(drawing)
+            hand_hard[drawing] += card
+            hand_aces[drawing] += card == 1
+        hitting = np.zeros(num_rows, dtype=bool)
+        hitting[rows[action == HIT]] = True
+        player_turn(deal, hand_hard, hand_aces, hitting, upcard, hits)
+
+        # Busts lose and, under rules where it does, reaching 21 wins outright
+        score = hand_value(hand_hard[rows], hand_aces[rows])
+        end = hand_end[score]
+        bet = bets[slot, rows]
+        net[rows] += np.where(end == WIN, bet, 0.0) - np.where(end == BUST, bet, 0.0)
+        bets[slot, rows[end != PLAY_ON]] = 0
+        scores[slot, rows] = score
+
+    return net, bets, scores, first_action
+
+
+def play_round(deal, num_rows, policies, rules=CLASSIC, history=None):
+    """Plays one round at each of num_rows tables and returns net[seat, row], the units each seat won.
+
+    deal(rows) returns the next card for each of the given rows. Each table seats
+    one player per Policy in policies, betting one unit each. The cards go round
+    the table twice, the dealer taking the last card of each pass; the seats then
+    play in order, and the dealer plays if any bet is still waiting on the result.
+    history, if a dict, receives "draws"[seat, row], the cards each seat drew after
+    its first two, "action"[seat, row], its first action (see _play_hands),
+    "score"[seat, row], its first hand's final score, and "natural"[seat, row];
+    and per row the dealer's "upcard", "dealer_natural", "dealer_played" (whether
+    the dealer played out the hand) and "dealer_score".
+    """
+    arrays = rule_arrays(rules)
+    tables, dealer_hits = arrays[:2]
+    seats = len(policies)
+    every = np.arange(num_rows)
+    hard = np.zeros((seats + 1, num_rows), dtype=np.int16)
+    aces = np.zeros((seats + 1, num_rows), dtype=np.int16)
+    first = np.zeros((seats + 1, num_rows), dtype=np.int16)
+    for deal_pass in range(2):
+        for hand in range(seats + 1):
+            card = deal(every)
+            hard[hand] += card
+            aces[hand] += card == 1
+            if not deal_pass:
+                first[hand] = card
+    upcard = first[seats]
+    dealer_natural = hand_value(hard[seats], aces[seats]) == 21
+
+    net = np.zeros((seats, num_rows))
+    bets = []
+    scores = []
+    draws = np.zeros((seats, num_rows), dtype=np.uint8)
+    first_actions = np.zeros((seats, num_rows), dtype=np.uint8)
+    for seat, policy in enumerate(policies):
+        # Naturals are settled first; insurance is settled when the dealer checks for one
+        natural = hand_value(hard[seat], aces[seat]) == 21
+        net[seat] = np.where(natural, np.where(dealer_natural, tables.natural_vs_natural, tables.natural_payout),
+                             -dealer_natural.astype(np.float64))
+        if tables.insurance and policy.insure:
+            net[seat] += np.where(upcard == 1, np.where(dealer_natural, 1.0, -0.5), 0.0)
+        live = ~natural & ~dealer_natural
+        seat_deal = deal
+        if history is not None:
+            def seat_deal(rows, seat_draws=draws[seat]):
+                seat_draws[rows] += 1
+                return deal(rows)
+        seat_net, seat_bets, seat_scores, first_actions[seat] = _play_hands(
+            seat_deal, hard[seat], aces[seat], first[seat], upcard, live, policy, arrays)
+        net[seat] += seat_net
+        bets.append(seat_bets)
+        scores.append(seat_scores)
+
+    bets = np.stack(bets)
+    waiting = bets > 0
+    dealer_played = waiting.any(axis=(0, 1))
+    dealer_score = dealer_turn(deal, hard[seats], aces[seats], dealer_played, dealer_hits)
+    scores = np.stack(scores)
+    won = (dealer_score > 21) | (scores > dealer_score)
+    lost = ~won & (scores < dealer_score)
+    net += (bets * (won.astype(np.int8) - lost)).sum(axis=1)
+    if history is not None:
+        history["draws"] = draws
+        history["action"] = first_actions
+        # Hands that were never played (naturals either side) keep their first two cards
+        dealt = hand_value(hard[:seats], aces[:seats])
+        history["score"] = np.where(scores[:, 0] > 0, scores[:, 0], dealt)
+        history["natural"] = dealt == 21
+        history["upcard"] = upcard
+        history["dealer_natural"] = dealer_natural
+        history["dealer_played"] = dealer_played
+        history["dealer_score"] = dealer_score
+    return net
+
+
+def outcome_codes(net):
+    """PLAYER/COMPUTER/TIE codes for net payouts: any gain is a Player win and any loss a Computer one."""
+    return np.where(net > 0, PLAYER, np.where(net < 0, COMPUTER, TIE)).astype(np.int8)
+
+
+def play_batch(num_rounds, rng, policy=None, rules=CLASSIC, log=None, num_decks=1, stats=None):
+    """Plays num_rounds independent rounds, each from a fresh shoe of num_decks decks, and returns their net payouts.
+
+    policy is the player's Policy (see strategy.py); by default the player hits
+    below 17, as in play_blackjack. rules is the RuleSet played (see rules.py).
+    With a hand_log.HandLog as log, every round is recorded in it, and with a
+    round_stats.RoundStats as stats, every round is counted in it.
+    """
+    decks = new_decks(num_rounds, num_decks)
+    pointer = np.zeros(num_rounds, dtype=np.intp)
+
+    def deal(rows):
+        return draw(decks, rows, pointer, rng)
+
+    if log is None and stats is None:
+        return play_round(deal, num_rounds, [policy or DEFAULT_POLICY], rules)[0]
+    history = {}
+    net = play_round(deal, num_rounds, [policy or DEFAULT_POLICY], rules, history)[0]
+    if log is not None:
+        log.write_batch(decks, pointer, history["draws"][0], history["action"][0], net)
+    if stats is not None:
+        stats.record_batch(history["upcard"], history["draws"][0], history["score"][0], history["dealer_score"],
+                           history["dealer_played"], history["natural"][0], history["dealer_natural"])
+    return net
+
+
+def simulate(num_simulations, rng=None, policy=None, batch_size=100_000, rules=None, log=None, num_decks=1,
+             stats=None):
+    """Plays num_simulations rounds in batches and returns the Player/Computer/Tie counts.
+
+    Each round is dealt from a fresh shoe of num_decks decks. log and stats are
+    passed on to play_batch.
+
+    With a RuleSet, the rounds are played under it and the dict also holds "Units",
+    the units the player won in total, and "UnitsSquared", the sum of their squares
+    per round, since payouts are no longer just +1 or -1.
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+    counts = np.zeros(len(OUTCOMES), dtype=np.int64)
+    units = units_squared = 0.0
+    remaining = num_simulations
+    while remaining > 0:
+        size = min(batch_size, remaining)
+        net = play_batch(size, rng, policy, CLASSIC if rules is None else rules, log, num_decks, stats)
+        counts += np.bincount(outcome_codes(net), minlength=len(OUTCOMES))
+        units += float(net.sum())
+        units_squared += float(np.dot(net, net))
+        remaining -= size
+    results = dict(zip(OUTCOMES, counts.tolist()))
+    if rules is not None:
+        results["Units"] = units
+        results["UnitsSquared"] = units_squared
+    return results
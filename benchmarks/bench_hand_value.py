@@ -0,0 +1,82 @@
+"""Micro-benchmark: incremental hand states vs. re-evaluating the hand after every card.
+
+Run from the repository root:  python -m benchmarks.bench_hand_value
+"""
+import random
+import timeit
+
+from cards import CARD_NAMES, EMPTY_HAND, Hand, add_card, evaluate_hand, state_value
+
+
+def legacy_evaluate_hand(hand):
+    """The string-parsing evaluate_hand the modules used before cards.py, for reference."""
+    values = {'J': 10, 'Q': 10, 'K': 10}
+    hand_value = 0
+    aces = 0
+
+    for card in hand:
+        rank = card.split()[0]
+        if rank == 'A':
+            aces += 1
+        elif rank in values:
+            hand_value += values[rank]
+        else:
+            hand_value += int(rank)
+
+    for _ in range(aces):
+        if hand_value + 11 <= 21:
+            hand_value += 11
+        else:
+            hand_value += 1
+
+    return hand_value
+
+
+def play_legacy(deals):
+    for deal in deals:
+        hand = []
+        for card in deal:
+            hand.append(CARD_NAMES[card])
+            legacy_evaluate_hand(hand)
+
+
+def play_reevaluate(deals):
+    for deal in deals:
+        hand = []
+        for card in deal:
+            hand.append(card)
+            evaluate_hand(hand)
+
+
+def play_incremental(deals):
+    for deal in deals:
+        hand = Hand()
+        for card in deal:
+            hand.add(card)
+            hand.value()
+
+
+def play_state(deals):
+    for deal in deals:
+        state = EMPTY_HAND
+        for card in deal:
+            state = add_card(state, card)
+            state_value(state)
+
+
+def main(num_hands=20_000, cards_per_hand=4, repeat=5):
+    rng = random.Random(0)
+    deals = [rng.sample(range(52), cards_per_hand) for _ in range(num_hands)]
+    num_cards = num_hands * cards_per_hand
+
+    print(f"{num_hands} hands of {cards_per_hand} cards, scored after every card (best of {repeat}):")
+    for name, play in [("legacy string evaluate_hand", play_legacy),
+                       ("cards.evaluate_hand", play_reevaluate),
+                       ("incremental Hand state", play_incremental),
+                       ("add_card / state_value", play_state)]:
+        best = min(timeit.repeat(lambda: play(deals), number=1, repeat=repeat))
+        print(f"  {name:28} {best * 1e9 / num_cards:8.1f} ns/card")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Load test for the web game's JSON API.
+
+Each simulated player keeps one HTTP connection open and plays complete games
+through /api/reset, /api/hit and /api/stand. Start the server first, then run
+from the repository root:
+
+    python -m benchmarks.loadtest --url http://127.0.0.1:5000 --players 50 --duration 30
+"""
+import argparse
+import http.client
+import json
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+def play(url, deadline, latencies, errors, seed):
+    """Plays games until the deadline, appending each request's latency in seconds."""
+    parts = urlsplit(url)
+    conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=10)
+    rng = random.Random(seed)
+    cookie = None
+
+    def request(method, path):
+        nonlocal cookie
+        headers = {"Cookie": cookie} if cookie else {}
+        start = time.perf_counter()
+        conn.request(method, path, headers=headers)
+        response = conn.getresponse()
+        body = response.read()
+        latencies.append(time.perf_counter() - start)
+        if response.status != 200:
+            errors.append(response.status)
+        set_cookie = response.getheader("Set-Cookie")
+        if set_cookie:
+            cookie = set_cookie.split(";", 1)[0]
+        return json.loads(body)
+
+    while time.perf_counter() < deadline:
+        game_over = request("POST", "/api/reset")["game_over"]
+        # Hit a random number of times, then stand until the game is over
+        for _ in range(rng.randint(0, 2)):
+            if game_over:
+                break
+            game_over = request("POST", "/api/hit").get("game_over", False)
+        while not game_over and time.perf_counter() < deadline:
+            game_over = request("POST", "/api/stand").get("game_over", False)
+    conn.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://127.0.0.1:5000")
+    parser.add_argument("--players", type=int, default=20, help="concurrent simulated players")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds to run")
+    args = parser.parse_args(argv)
+
+    latencies = []
+    errors = []
+    deadline = time.perf_counter() + args.duration
+    threads = [threading.Thread(target=play, args=(args.url, deadline, latencies, errors, seed))
+               for seed in range(args.players)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    print(f"{len(latencies)} requests in {elapsed:.1f}s from {args.players} players, {len(errors)} errors")
+    print(f"  throughput: {len(latencies) / elapsed:.0f} requests/sec")
+    for label, fraction in (("p50", 0.50), ("p90", 0.90), ("p99", 0.99)):
+        print(f"  {label} latency: {percentile(latencies, fraction) * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
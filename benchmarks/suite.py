@@ -0,0 +1,248 @@
+"""Benchmark suite for the game and simulation hot paths, with stored baselines.
+
+Each benchmark reports the time per operation (ns/op), operations per second
+(hands, cards or requests, per its unit) and the peak memory traced while it runs.
+Run from the repository root:
+
+    python -m benchmarks.suite run --output results.json
+    python -m benchmarks.suite compare benchmarks/baseline.json results.json
+
+compare exits with status 1 if any benchmark got slower, or used more memory,
+than the baseline by more than the threshold. To refresh the committed baseline
+after an intended change, run with --output benchmarks/baseline.json.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import sys
+import timeit
+import tracemalloc
+
+import numpy as np
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+THRESHOLD = 0.15  # Allowed slowdown or memory growth before compare flags a regression
+MEMORY_SLACK = 64 * 1024  # Peak memory growth below this many bytes is never flagged
+
+
+def _deals(num_hands, cards_per_hand=4):
+    rng = random.Random(0)
+    return [rng.sample(range(52), cards_per_hand) for _ in range(num_hands)]
+
+
+def bench_evaluate_hand(num_hands):
+    """cards.evaluate_hand on whole hands, as Simulation.py and bj.py once each did with their own copy."""
+    from cards import evaluate_hand
+    deals = _deals(num_hands)
+    return lambda: [evaluate_hand(deal) for deal in deals]
+
+
+def bench_player_evaluate_hand(num_hands):
+    """Simulation.Player.evaluate_hand after every card, as play_blackjack scores hands."""
+    from Simulation import Player
+    deals = _deals(num_hands)
+
+    def run():
+        for deal in deals:
+            player = Player("Player")
+            for card in deal:
+                player.hand.add(card)
+                player.evaluate_hand()
+    return run
+
+
+def bench_state_value(num_hands):
+    """add_card / state_value after every card, as app.py scores hands."""
+    from cards import EMPTY_HAND, add_card, state_value
+    deals = _deals(num_hands)
+
+    def run():
+        for deal in deals:
+            state = EMPTY_HAND
+            for card in deal:
+                state = add_card(state, card)
+                state_value(state)
+    return run
+
+
+def bench_new_deck(num_decks):
+    """bj.initialize_deck: a new shuffled deck."""
+    from bj import initialize_deck
+    return lambda: [initialize_deck() for _ in range(num_decks)]
+
+
+def bench_draw_card(num_cards):
+    """bj.draw_card through whole decks, reshuffling as they run out."""
+    from bj import draw_card, initialize_deck
+    deck = initialize_deck()
+    return lambda: [draw_card(deck) for _ in range(num_cards)]
+
+
+def bench_web_draw_card(num_cards):
+    """app.draw_card, which reads the card at the game's cursor from its cached shuffle."""
+    from app import draw_card, new_game
+    game = new_game()
+
+    def run():
+        for _ in range(num_cards):
+            game['cursor'] = 4
+            draw_card(game)
+    return run
+
+
+def bench_play_blackjack(num_hands):
+    """play_blackjack, one round at a time."""
+    from Simulation import play_blackjack
+    rng = random.Random(0)
+    return lambda: [play_blackjack(rng=rng) for _ in range(num_hands)]
+
+
+def bench_monte_carlo(engine):
+    def bench(num_hands):
+        from Simulation import monte_carlo_simulation
+        return lambda: monte_carlo_simulation(num_hands, engine=engine, seed=0)
+    bench.__doc__ = f"monte_carlo_simulation with engine={engine!r}."
+    return bench
+
+
+def bench_route(method, path):
+    def bench(num_requests):
+        from app import app
+        client = app.test_client()
+        client.get("/")
+        send = client.get if method == "GET" else client.post
+
+        def run():
+            for _ in range(num_requests):
+                send(path)
+        return run
+    bench.__doc__ = f"{method} {path} through the Flask test client."
+    return bench
+
+
+# name: (setup(ops) -> callable, unit, ops per run, ops per quick run)
+BENCHMARKS = {
+    "evaluate_hand.cards": (bench_evaluate_hand, "hands", 20_000, 2_000),
+    "evaluate_hand.simulation_player": (bench_player_evaluate_hand, "hands", 20_000, 2_000),
+    "evaluate_hand.state_table": (bench_state_value, "hands", 20_000, 2_000),
+    "deck.create": (bench_new_deck, "decks", 5_000, 500),
+    "deck.draw_card": (bench_draw_card, "cards", 100_000, 10_000),
+    "web.draw_card": (bench_web_draw_card, "cards", 5_000, 500),
+    "play_blackjack": (bench_play_blackjack, "hands", 20_000, 2_000),
+    "monte_carlo.python.1k": (bench_monte_carlo("python"), "hands", 1_000, 1_000),
+    "monte_carlo.python.10k": (bench_monte_carlo("python"), "hands", 10_000, 10_000),
+    "monte_carlo.numpy.100k": (bench_monte_carlo("numpy"), "hands", 100_000, 100_000),
+    "monte_carlo.numpy.1m": (bench_monte_carlo("numpy"), "hands", 1_000_000, 100_000),
+    "route.index": (bench_route("GET", "/"), "requests", 2_000, 200),
+    "route.hit": (bench_route("POST", "/hit"), "requests", 2_000, 200),
+    "route.stand": (bench_route("POST", "/stand"), "requests", 2_000, 200),
+    "route.api_game": (bench_route("GET", "/api/game"), "requests", 2_000, 200),
+    "route.api_hit": (bench_route("POST", "/api/hit"), "requests", 2_000, 200),
+}
+
+
+def measure(setup, ops, repeat):
+    """Runs one benchmark: best time of repeat runs, then one more run under tracemalloc."""
+    run = setup(ops)
+    run()  # Warm up caches and lazy imports
+    best = min(timeit.repeat(run, number=1, repeat=repeat))
+    tracemalloc.start()
+    try:
+        run()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {"ops": ops, "seconds": best, "ns_per_op": best * 1e9 / ops, "ops_per_sec": ops / best,
+            "peak_memory_bytes": peak}
+
+
+def run_suite(names=None, quick=False, repeat=5):
+    """Runs the named benchmarks (all by default) and returns the results document."""
+    results = {}
+    for name in names or BENCHMARKS:
+        setup, unit, ops, quick_ops = BENCHMARKS[name]
+        results[name] = {"unit": unit, **measure(setup, quick_ops if quick else ops, repeat)}
+        print(f"  {name:34} {results[name]['ns_per_op']:14,.0f} ns/op "
+              f"{results[name]['ops_per_sec']:14,.0f} {unit}/s "
+              f"{results[name]['peak_memory_bytes'] / 1024:10,.0f} KiB peak", file=sys.stderr)
+    return {
+        "meta": {
+            "date": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "quick": quick,
+        },
+        "results": results,
+    }
+
+
+def compare(baseline, current, threshold=THRESHOLD):
+    """Returns a line per benchmark in both documents, and the names that regressed."""
+    lines = []
+    regressions = []
+    for name, result in current["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            lines.append(f"  {name:34} new")
+            continue
+        time_ratio = result["ns_per_op"] / base["ns_per_op"]
+        memory_ratio = (result["peak_memory_bytes"] + 1) / (base["peak_memory_bytes"] + 1)
+        memory_growth = result["peak_memory_bytes"] - base["peak_memory_bytes"]
+        flags = []
+        if time_ratio > 1 + threshold:
+            flags.append("SLOWER")
+        if memory_ratio > 1 + threshold and memory_growth > MEMORY_SLACK:
+            flags.append("MORE MEMORY")
+        if flags:
+            regressions.append(name)
+        lines.append(f"  {name:34} time x{time_ratio:5.2f}  memory x{memory_ratio:5.2f}  {' '.join(flags)}")
+    return lines, regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_parser = commands.add_parser("run", help="run the benchmarks and write JSON results")
+    run_parser.add_argument("--output", "-o", help="results file (default: standard output)")
+    run_parser.add_argument("--quick", action="store_true", help="fewer operations per benchmark")
+    run_parser.add_argument("--repeat", type=int, default=5, help="runs per benchmark, best one kept")
+    run_parser.add_argument("names", nargs="*", metavar="name",
+                            help=f"benchmarks to run (default: all): {', '.join(BENCHMARKS)}")
+    compare_parser = commands.add_parser("compare", help="flag regressions against a baseline")
+    compare_parser.add_argument("baseline", nargs="?", default=BASELINE)
+    compare_parser.add_argument("results")
+    compare_parser.add_argument("--threshold", type=float, default=THRESHOLD,
+                                help="allowed fractional slowdown or memory growth")
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        unknown = [name for name in args.names if name not in BENCHMARKS]
+        if unknown:
+            parser.error(f"unknown benchmark(s): {', '.join(unknown)}")
+        document = json.dumps(run_suite(args.names, args.quick, args.repeat), indent=2) + "\n"
+        if args.output:
+            with open(args.output, "w") as f:
+                f.write(document)
+        else:
+            sys.stdout.write(document)
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.results) as f:
+        current = json.load(f)
+    lines, regressions = compare(baseline, current, args.threshold)
+    print("\n".join(lines))
+    if regressions:
+        print(f"{len(regressions)} regression(s) beyond {args.threshold:.0%}: {', '.join(regressions)}")
+        return 1
+    print("No regressions.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
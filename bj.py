@@ -1,228 +1,357 @@
-import random
+import argparse
 import os
+import sys
 import time
+from cards import Hand, Shoe, card_symbol, card_value
+
+class AnsiScreen:
+    """Draws the game in frames, rewriting only the lines that changed since the last one.
+
+    Lines are collected with say() and sent in one write, using ANSI cursor
+    escapes, whenever the game pauses or waits for input.
+    """
+
+    def __init__(self, out=sys.stdout):
+        if os.name == 'nt':
+            os.system('')  # Turns on ANSI escape handling in the Windows console
+        self.out = out
+        self.lines = []
+        self.shown = None
+
+    def clear(self):
+        self.lines = []
+
+    def say(self, text=""):
+        self.lines.extend(str(text).split("\n"))
+
+    def flush(self):
+        shown = self.shown
+        parts = []
+        if shown is None:
+            parts.append("\x1b[2J")
+            shown = []
+        for row, line in enumerate(self.lines):
+            if row >= len(shown) or shown[row] != line:
+                parts.append(f"\x1b[{row + 1};1H{line}\x1b[K")
+        parts.append(f"\x1b[{len(self.lines) + 1};1H")
+        if len(self.lines) < len(shown):
+            parts.append("\x1b[J")
+        self.out.write("".join(parts))
+        self.out.flush()
+        self.shown = list(self.lines)
+
+    def ask(self, prompt):
+        *before, prompt = prompt.split("\n")
+        self.lines.extend(before)
+        self.flush()
+        answer = input(prompt)
+        # The terminal now shows the prompt and answer as the frame's last line
+        self.lines.append(prompt + answer)
+        self.shown.append(prompt + answer)
+        return answer
+
+class PlainScreen:
+    """Prints lines as they come, for output that isn't a terminal."""
+
+    def __init__(self, out=sys.stdout):
+        self.out = out
+
+    def clear(self):
+        self.out.write("\n")
+
+    def say(self, text=""):
+        self.out.write(f"{text}\n")
+
+    def flush(self):
+        self.out.flush()
+
+    def ask(self, prompt):
+        return input(prompt)
+
+class NullScreen:
+    """Shows nothing, for bot games run at full speed."""
+
+    def clear(self):
+        pass
+
+    def say(self, text=""):
+        pass
+
+    def flush(self):
+        pass
+
+    def ask(self, prompt):
+        raise RuntimeError("A headless game needs a strategy to decide for the player.")
+
+# Where the game is drawn, and how long its pauses last (0 skips them)
+screen = AnsiScreen() if sys.stdout.isatty() else PlainScreen()
+pause_scale = float(os.environ.get('BJ_PAUSE_SCALE', '1'))
+
+def say(text=""):
+    screen.say(text)
+
+def pause(seconds):
+    """Shows what has been said so far, then waits seconds times pause_scale."""
+    screen.flush()
+    if pause_scale > 0:
+        time.sleep(seconds * pause_scale)
 
 def clear_screen():
-    """Clear the terminal screen."""
-    os.system('cls' if os.name == 'nt' else 'clear')
+    """Start a new frame; only what changes from the last one is redrawn."""
+    screen.clear()
 
-def initialize_deck():
-    """Create a standard 52-card deck."""
-    suits = ['♠', '♣', '♥', '♦']
-    ranks = ['A', '2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K']
-    return [f"{rank}{suit}" for suit in suits for rank in ranks]
-
-def evaluate_hand(hand):
-    """Calculate the value of a hand."""
-    values = {'J': 10, 'Q': 10, 'K': 10}
-    hand_value = 0
-    aces = 0
-
-    for card in hand:
-        rank = card[:-1]  # Remove suit emoji
-        if rank == 'A':
-            aces += 1
-        elif rank in values:
-            hand_value += values[rank]
-        else:
-            hand_value += int(rank)
+def ask(prompt):
+    return screen.ask(prompt)
 
-    # Handle aces
-    for _ in range(aces):
-        if hand_value + 11 <= 21:
-            hand_value += 11
-        else:
-            hand_value += 1
+def threshold_strategy(stand_on=17):
+    """A bot strategy that hits any score below stand_on."""
+    return lambda hand, upcard: hand.value() < stand_on
 
-    return hand_value
+def policy_strategy(policy):
+    """A bot strategy that plays a strategy.Policy, such as strategy.basic_strategy()."""
+    return lambda hand, upcard: policy.should_hit(hand.value(), hand.is_soft(), upcard)
+
+def initialize_deck():
+    """Create a shuffled standard 52-card deck."""
+    return Shoe()
 
 def display_hand(name, hand, hide_second=False):
     """Display a player's hand."""
-    print(f"\n{name}'s Hand:")
+    say(f"\n{name}'s Hand:")
     if hide_second:
-        print(f"  {hand[0]}  [Hidden]")
-        print(f"  Score: ?")
+        say(f"  {card_symbol(hand[0])}  [Hidden]")
+        say(f"  Score: ?")
     else:
-        print(f"  {' '.join(hand)}")
-        print(f"  Score: {evaluate_hand(hand)}")
+        say(f"  {' '.join(map(card_symbol, hand))}")
+        say(f"  Score: {hand.value()}")
 
 def draw_card(deck):
-    """Draw a random card from the deck."""
-    card = random.choice(deck)
-    deck.remove(card)
-    return card
+    """Deal the next card from the deck."""
+    return deck.draw()
 
 def display_game_state(player_hand, dealer_hand, hide_dealer=True):
     """Display the current game state."""
     clear_screen()
-    print("=" * 50)
-    print("                   BLACKJACK")
-    print("=" * 50)
+    say("=" * 50)
+    say("                   BLACKJACK")
+    say("=" * 50)
     
     display_hand("Dealer", dealer_hand, hide_dealer)
     display_hand("Player", player_hand)
-    print("\n" + "-" * 50)
+    say("\n" + "-" * 50)
+
+def player_turn(deck, player_hand, dealer_hand, strategy=None):
+    """Handle the player's turn.
 
-def player_turn(deck, player_hand, dealer_hand):
-    """Handle the player's turn."""
+    With a strategy, strategy(player_hand, upcard value) decides instead of the
+    player, returning True to hit and False to stand.
+    """
     while True:
         display_game_state(player_hand, dealer_hand, hide_dealer=True)
         
-        player_score = evaluate_hand(player_hand)
+        player_score = player_hand.value()
         
         # Check for bust
         if player_score > 21:
-            print("\n💥 BUST! You went over 21!")
-            time.sleep(2)
+            say("\n💥 BUST! You went over 21!")
+            pause(2)
             return False
         
         # Check for 21
         if player_score == 21:
-            print("\n🎯 You got 21!")
-            time.sleep(2)
+            say("\n🎯 You got 21!")
+            pause(2)
             return True
         
         # Get player input
-        print("\nChoose an action:")
-        print("  [H] Hit - Draw another card")
-        print("  [S] Stand - Keep your current hand")
+        say("\nChoose an action:")
+        say("  [H] Hit - Draw another card")
+        say("  [S] Stand - Keep your current hand")
         
-        choice = input("\nYour choice: ").strip().upper()
+        if strategy is not None:
+            choice = 'H' if strategy(player_hand, card_value(dealer_hand[0])) else 'S'
+        else:
+            choice = ask("\nYour choice: ").strip().upper()
         
         if choice == 'H':
-            player_hand.append(draw_card(deck))
+            player_hand.add(draw_card(deck))
         elif choice == 'S':
             return True
         else:
-            print("\n❌ Invalid choice! Please enter H or S.")
-            time.sleep(1.5)
+            say("\n❌ Invalid choice! Please enter H or S.")
+            pause(1.5)
 
 def dealer_turn(deck, dealer_hand):
     """Handle the dealer's turn."""
-    while evaluate_hand(dealer_hand) < 17:
-        print(f"\nDealer draws a card...")
-        time.sleep(1.5)
-        dealer_hand.append(draw_card(deck))
-        dealer_score = evaluate_hand(dealer_hand)
-        print(f"Dealer's new card: {dealer_hand[-1]}")
-        print(f"Dealer's score: {dealer_score}")
-        time.sleep(1.5)
+    while dealer_hand.value() < 17:
+        say(f"\nDealer draws a card...")
+        pause(1.5)
+        dealer_hand.add(draw_card(deck))
+        dealer_score = dealer_hand.value()
+        say(f"Dealer's new card: {card_symbol(dealer_hand[-1])}")
+        say(f"Dealer's score: {dealer_score}")
+        pause(1.5)
         
         if dealer_score > 21:
-            print("\n💥 Dealer BUSTS!")
-            time.sleep(2)
+            say("\n💥 Dealer BUSTS!")
+            pause(2)
             return False
     
     return True
 
 def determine_winner(player_hand, dealer_hand):
-    """Determine the winner and display results."""
-    player_score = evaluate_hand(player_hand)
-    dealer_score = evaluate_hand(dealer_hand)
+    """Determine the winner, display results and return "Player", "Dealer" or "Tie"."""
+    player_score = player_hand.value()
+    dealer_score = dealer_hand.value()
     
     display_game_state(player_hand, dealer_hand, hide_dealer=False)
     
-    print("\n" + "=" * 50)
-    print("                 FINAL RESULTS")
-    print("=" * 50)
-    print(f"  Your score:   {player_score}")
-    print(f"  Dealer score: {dealer_score}")
-    print("-" * 50)
+    say("\n" + "=" * 50)
+    say("                 FINAL RESULTS")
+    say("=" * 50)
+    say(f"  Your score:   {player_score}")
+    say(f"  Dealer score: {dealer_score}")
+    say("-" * 50)
     
     if dealer_score > 21:
-        print("\n🎉 YOU WIN! Dealer busted!")
+        say("\n🎉 YOU WIN! Dealer busted!")
+        winner = "Player"
     elif player_score > dealer_score:
-        print("\n🎉 YOU WIN! Higher score!")
+        say("\n🎉 YOU WIN! Higher score!")
+        winner = "Player"
     elif player_score < dealer_score:
-        print("\n😔 DEALER WINS! Dealer has higher score!")
+        say("\n😔 DEALER WINS! Dealer has higher score!")
+        winner = "Dealer"
     else:
-        print("\n🤝 IT'S A TIE! Push!")
+        say("\n🤝 IT'S A TIE! Push!")
+        winner = "Tie"
     
-    print("=" * 50)
+    say("=" * 50)
+    return winner
+
+def play_game(strategy=None):
+    """Main game loop. Returns the winner: "Player", "Dealer" or "Tie".
 
-def play_game():
-    """Main game loop."""
+    strategy is passed to player_turn, to play without asking.
+    """
     # Initialize deck and hands
     deck = initialize_deck()
-    player_hand = []
-    dealer_hand = []
+    player_hand = Hand()
+    dealer_hand = Hand()
     
     # Deal initial cards
     for _ in range(2):
-        player_hand.append(draw_card(deck))
-        dealer_hand.append(draw_card(deck))
+        player_hand.add(draw_card(deck))
+        dealer_hand.add(draw_card(deck))
     
     # Check for natural blackjack
-    player_score = evaluate_hand(player_hand)
-    dealer_score = evaluate_hand(dealer_hand)
+    player_score = player_hand.value()
+    dealer_score = dealer_hand.value()
     
     display_game_state(player_hand, dealer_hand, hide_dealer=True)
     
     if player_score == 21 and dealer_score == 21:
         display_game_state(player_hand, dealer_hand, hide_dealer=False)
-        print("\n🤝 Both have BLACKJACK! It's a tie!")
-        time.sleep(3)
-        return
+        say("\n🤝 Both have BLACKJACK! It's a tie!")
+        pause(3)
+        return "Tie"
     elif player_score == 21:
         display_game_state(player_hand, dealer_hand, hide_dealer=False)
-        print("\n🎉 BLACKJACK! You win!")
-        time.sleep(3)
-        return
+        say("\n🎉 BLACKJACK! You win!")
+        pause(3)
+        return "Player"
     elif dealer_score == 21:
         display_game_state(player_hand, dealer_hand, hide_dealer=False)
-        print("\n😔 Dealer has BLACKJACK! Dealer wins!")
-        time.sleep(3)
-        return
+        say("\n😔 Dealer has BLACKJACK! Dealer wins!")
+        pause(3)
+        return "Dealer"
     
     # Player's turn
-    if not player_turn(deck, player_hand, dealer_hand):
+    if not player_turn(deck, player_hand, dealer_hand, strategy):
         display_game_state(player_hand, dealer_hand, hide_dealer=False)
-        print("\n😔 DEALER WINS!")
-        time.sleep(3)
-        return
+        say("\n😔 DEALER WINS!")
+        pause(3)
+        return "Dealer"
     
     # Dealer's turn
     display_game_state(player_hand, dealer_hand, hide_dealer=False)
-    print("\nDealer's turn...")
-    time.sleep(2)
+    say("\nDealer's turn...")
+    pause(2)
     
     dealer_turn(deck, dealer_hand)
     
     # Determine winner
-    determine_winner(player_hand, dealer_hand)
-    time.sleep(3)
+    winner = determine_winner(player_hand, dealer_hand)
+    pause(3)
+    return winner
+
+def play_bot(num_games, strategy):
+    """Plays num_games games with the strategy deciding; returns the wins of each side and the games/sec."""
+    results = {"Player": 0, "Dealer": 0, "Tie": 0}
+    start = time.perf_counter()
+    for _ in range(num_games):
+        results[play_game(strategy)] += 1
+    return results, num_games / (time.perf_counter() - start)
 
-def main():
+def main(argv=None):
     """Main program entry point."""
+    global screen, pause_scale
+    parser = argparse.ArgumentParser(description="Console Blackjack.")
+    parser.add_argument("--pause-scale", type=float, default=None,
+                        help="multiply every pause by this (0 for none; default BJ_PAUSE_SCALE or 1)")
+    parser.add_argument("--plain", action="store_true", help="print lines instead of redrawing the screen")
+    parser.add_argument("--bot", type=int, metavar="GAMES",
+                        help="play GAMES games headless at full speed, hitting below --stand-on")
+    parser.add_argument("--stand-on", type=int, default=17, help="the bot's standing score")
+    parser.add_argument("--show", action="store_true", help="draw the bot's games instead of running headless")
+    args = parser.parse_args(argv)
+
+    if args.plain:
+        screen = PlainScreen()
+    if args.pause_scale is not None:
+        pause_scale = args.pause_scale
+
+    if args.bot is not None:
+        if not args.show:
+            screen = NullScreen()
+        if args.pause_scale is None:
+            pause_scale = 0
+        results, rate = play_bot(args.bot, threshold_strategy(args.stand_on))
+        screen.flush()
+        print(f"{args.bot} games: {results['Player']} player wins, {results['Dealer']} dealer wins, "
+              f"{results['Tie']} ties ({rate:,.0f} games/sec)")
+        return
+
     while True:
         clear_screen()
-        print("=" * 50)
-        print("                   BLACKJACK")
-        print("=" * 50)
-        print("\nWelcome to Blackjack!")
-        print("\nRules:")
-        print("  • Get as close to 21 as possible without going over")
-        print("  • Face cards (J, Q, K) are worth 10 points")
-        print("  • Aces can be worth 1 or 11 points")
-        print("  • Dealer must draw until reaching at least 17")
-        print("\n" + "=" * 50)
+        say("=" * 50)
+        say("                   BLACKJACK")
+        say("=" * 50)
+        say("\nWelcome to Blackjack!")
+        say("\nRules:")
+        say("  • Get as close to 21 as possible without going over")
+        say("  • Face cards (J, Q, K) are worth 10 points")
+        say("  • Aces can be worth 1 or 11 points")
+        say("  • Dealer must draw until reaching at least 17")
+        say("\n" + "=" * 50)
         
-        input("\nPress ENTER to start the game...")
+        ask("\nPress ENTER to start the game...")
         
         play_game()
         
         # Ask to play again
         while True:
-            play_again = input("\nPlay again? (Y/N): ").strip().upper()
+            play_again = ask("\nPlay again? (Y/N): ").strip().upper()
             if play_again in ['Y', 'N']:
                 break
-            print("Please enter Y or N.")
+            say("Please enter Y or N.")
         
         if play_again == 'N':
             clear_screen()
-            print("\n" + "=" * 50)
-            print("          Thanks for playing Blackjack!")
-            print("=" * 50 + "\n")
+            say("\n" + "=" * 50)
+            say("          Thanks for playing Blackjack!")
+            say("=" * 50 + "\n")
+            screen.flush()
             break
 
 if __name__ == "__main__":
@@ -0,0 +1,95 @@
+"""Builds optimized card art for the web game into static/build/.
+
+Every card image in static/assets/images is resized to the size it is shown at
+(at 2x for high-density screens) and written as WebP and, when Pillow supports it,
+AVIF. All cards are also packed into one WebP sprite sheet with a CSS class per
+card. Filenames carry a hash of their content, so app.py can serve them with
+immutable cache headers, and manifest.json maps card keys (e.g. 'sa') to files.
+
+    pip install pillow
+    python build_assets.py
+"""
+import hashlib
+import io
+import json
+import os
+import shutil
+
+from PIL import Image, ImageOps, features
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+SOURCE_DIR = os.path.join(ROOT, "static", "assets", "images")
+BUILD_DIR = os.path.join(ROOT, "static", "build")
+BUILD_URL = "/static/build"
+
+CARD_SIZE = (200, 273)  # 2x the 100px-wide .card in styles.css
+SUITS = "schd"
+RANKS = ["a", "2", "3", "4", "5", "6", "7", "8", "9", "10", "j", "q", "k"]
+QUALITY = {"webp": 80, "avif": 60}
+
+
+def card_sources():
+    """Maps each card key with art on disk (e.g. 'sa', 'h10', 'back') to its source file."""
+    sources = {}
+    for filename in os.listdir(SOURCE_DIR):
+        key, ext = os.path.splitext(filename)
+        if ext.lower() in (".jpg", ".jpeg", ".png"):
+            sources[key.lower()] = os.path.join(SOURCE_DIR, filename)
+    keys = [suit + rank for suit in SUITS for rank in RANKS] + ["back"]
+    return {key: sources[key] for key in keys if key in sources}
+
+
+def write_hashed(name, ext, data):
+    """Writes data as name.<hash>.ext in the build directory and returns its URL."""
+    digest = hashlib.sha256(data).hexdigest()[:12]
+    filename = f"{name}.{digest}.{ext}"
+    with open(os.path.join(BUILD_DIR, filename), "wb") as f:
+        f.write(data)
+    return f"{BUILD_URL}/{filename}"
+
+
+def encode(image, fmt):
+    buffer = io.BytesIO()
+    image.save(buffer, format=fmt.upper(), quality=QUALITY[fmt], method=6 if fmt == "webp" else None)
+    return buffer.getvalue()
+
+
+def build():
+    formats = ["webp"] + (["avif"] if features.check("avif") else [])
+    shutil.rmtree(BUILD_DIR, ignore_errors=True)
+    os.makedirs(BUILD_DIR)
+
+    sources = card_sources()
+    columns = len(RANKS)
+    rows = (len(sources) + columns - 1) // columns
+    sprite = Image.new("RGB", (CARD_SIZE[0] * columns, CARD_SIZE[1] * rows))
+    manifest = {"cards": {}, "sprite": {}}
+    css = [f".card-sprite {{ aspect-ratio: {CARD_SIZE[0]} / {CARD_SIZE[1]}; "
+           f"background-size: {columns * 100}% {rows * 100}%; }}"]
+
+    for index, (key, path) in enumerate(sources.items()):
+        with Image.open(path) as source:
+            card = ImageOps.fit(source.convert("RGB"), CARD_SIZE, Image.LANCZOS)
+        manifest["cards"][key] = {fmt: write_hashed(key, fmt, encode(card, fmt)) for fmt in formats}
+
+        row, column = divmod(index, columns)
+        sprite.paste(card, (column * CARD_SIZE[0], row * CARD_SIZE[1]))
+        x = column * 100 / (columns - 1)
+        y = row * 100 / (rows - 1) if rows > 1 else 0
+        css.append(f".card-{key} {{ background-position: {x:.4f}% {y:.4f}%; }}")
+        manifest["sprite"][key] = f"card-sprite card-{key}"
+
+    sprite_url = write_hashed("cards", "webp", encode(sprite, "webp"))
+    css.insert(1, f".card-sprite {{ background-image: url({sprite_url}); }}")
+    manifest["css"] = write_hashed("cards", "css", "\n".join(css).encode() + b"\n")
+
+    with open(os.path.join(BUILD_DIR, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    size = sum(os.path.getsize(os.path.join(BUILD_DIR, name)) for name in os.listdir(BUILD_DIR))
+    print(f"Built {len(sources)} cards as {', '.join(formats)} plus a sprite sheet: "
+          f"{size / 1024:.0f} KB in {BUILD_DIR}")
+
+
+if __name__ == "__main__":
+    build()
@@ -0,0 +1,196 @@
+"""Compact card representation shared by bj.py, Simulation.py and app.py.
+
+A card is an int from 0 to 51: suit * 13 + rank, with ranks ordered A, 2-10, J, Q, K
+and suits Spades, Clubs, Hearts, Diamonds. Shoes and hands keep their cards in
+bytearrays, and cards are only turned into strings for display.
+"""
+import random
+
+RANKS = ('A', '2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K')
+SUITS = ('Spades', 'Clubs', 'Hearts', 'Diamonds')
+SUIT_SYMBOLS = ('♠', '♣', '♥', '♦')
+DECK_SIZE = len(RANKS) * len(SUITS)
+
+# Blackjack value of each rank, with Aces counted as 1
+RANK_VALUES = (1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 10, 10, 10)
+# Value of every card, padded to 256 entries so it works as a bytes.translate() table
+CARD_VALUES = bytes(RANK_VALUES * len(SUITS)) + bytes(256 - DECK_SIZE)
+
+# Display strings, precomputed once per card
+CARD_NAMES = tuple(f"{rank} of {suit}" for suit in SUITS for rank in RANKS)
+CARD_SYMBOLS = tuple(f"{rank}{symbol}" for symbol in SUIT_SYMBOLS for rank in RANKS)
+
+
+def card_rank(card):
+    """Returns the rank index of a card (0 for Ace up to 12 for King)."""
+    return card % 13
+
+
+def card_suit(card):
+    """Returns the suit index of a card (0 for Spades up to 3 for Diamonds)."""
+    return card // 13
+
+
+def card_value(card):
+    """Returns the Blackjack value of a card, counting Aces as 1."""
+    return CARD_VALUES[card]
+
+
+def card_name(card):
+    """Returns the long name of a card (e.g., 'A of Spades')."""
+    return CARD_NAMES[card]
+
+
+def card_symbol(card):
+    """Returns the short name of a card with its suit symbol (e.g., 'A♠')."""
+    return CARD_SYMBOLS[card]
+
+
+def evaluate_hand(cards):
+    """Calculate the value of a hand of card ints (Aces can be 1 or 11)."""
+    values = bytes(cards).translate(CARD_VALUES)
+    hand_value = sum(values)
+    # One Ace counts as 11 if that doesn't bust the hand
+    if hand_value <= 11 and 1 in values:
+        hand_value += 10
+    return hand_value
+
+
+# Incremental hand states. A state packs the hard total (Aces as 1, capped at
+# MAX_HARD) with a flag for holding an Ace: state = hard * 2 + has_ace.
+MAX_HARD = 31
+NUM_STATES = (MAX_HARD + 1) * 2
+EMPTY_HAND = 0
+
+
+def _state(hard, has_ace):
+    return min(hard, MAX_HARD) * 2 + has_ace
+
+
+def _best_total(state):
+    hard, has_ace = divmod(state, 2)
+    return hard + 10 if has_ace and hard <= 11 else hard
+
+
+# Next state for every (state, card) pair, indexed by state * DECK_SIZE + card
+HAND_TRANSITIONS = bytes(
+    _state(state // 2 + RANK_VALUES[card_rank(card)], state % 2 or card_rank(card) == 0)
+    for state in range(NUM_STATES) for card in range(DECK_SIZE)
+)
+# Best total of every state, and whether that total counts an Ace as 11
+STATE_VALUES = bytes(_best_total(state) for state in range(NUM_STATES))
+STATE_SOFT = tuple(_best_total(state) != state // 2 for state in range(NUM_STATES))
+
+
+def add_card(state, card):
+    """Returns the hand state after adding a card to a hand in the given state."""
+    return HAND_TRANSITIONS[state * DECK_SIZE + card]
+
+
+def state_value(state):
+    """Returns the value of a hand in the given state."""
+    return STATE_VALUES[state]
+
+
+class Shoe:
+    """One or more decks of card ints, shuffled once and dealt by advancing a cursor.
+
+    Cards before the cursor have been dealt, so every draw is O(1) whatever the
+    number of decks. With random_draw=True each draw instead picks a random undealt
+    card and swaps it to the cursor, the same as drawing at random from a pile.
+    The shoe is due for a reshuffle once the cursor passes the cut card, placed at
+    the given fraction (penetration) of the shoe; it reshuffles by itself if it runs out.
+    """
+    __slots__ = ('cards', 'cursor', 'cut', 'random_draw', 'rng')
+
+    def __init__(self, num_decks=1, penetration=1.0, random_draw=False, rng=random, cards=None):
+        if cards is None:
+            self.cards = bytearray(range(DECK_SIZE)) * num_decks
+        else:
+            self.cards = bytearray(cards)
+        self.cut = int(len(self.cards) * penetration)
+        self.random_draw = random_draw
+        self.rng = rng
+        self.cursor = 0
+        if cards is None:
+            self.shuffle()
+
+    def __len__(self):
+        return len(self.cards) - self.cursor
+
+    def shuffle(self):
+        """Gathers all cards back in and shuffles them (Fisher-Yates)."""
+        if not self.random_draw:
+            self.rng.shuffle(self.cards)
+        self.cursor = 0
+
+    def needs_shuffle(self):
+        """Returns True once the cut card has been reached."""
+        return self.cursor >= self.cut
+
+    def draw(self):
+        """Deals the next card."""
+        cards = self.cards
+        cursor = self.cursor
+        if cursor >= len(cards):
+            self.shuffle()
+            cursor = 0
+        if self.random_draw:
+            # Swap-remove a random undealt card into the cursor position
+            pick = self.rng.randrange(cursor, len(cards))
+            cards[cursor], cards[pick] = cards[pick], cards[cursor]
+        self.cursor = cursor + 1
+        return cards[cursor]
+
+    def to_bytes(self):
+        """Returns the undealt cards as bytes, e.g. for storing in a session."""
+        return bytes(self.cards[self.cursor:])
+
+
+class Hand:
+    """A hand of card ints backed by a bytearray.
+
+    The hand keeps its state (see add_card) up to date as cards are added, so its
+    value and the blackjack, bust and soft checks never rescan the cards.
+    """
+    __slots__ = ('cards', 'state')
+
+    def __init__(self, cards=()):
+        self.cards = bytearray()
+        self.state = EMPTY_HAND
+        for card in cards:
+            self.add(card)
+
+    def __len__(self):
+        return len(self.cards)
+
+    def __iter__(self):
+        return iter(self.cards)
+
+    def __getitem__(self, index):
+        return self.cards[index]
+
+    def add(self, card):
+        """Adds a card to the hand."""
+        self.cards.append(card)
+        self.state = HAND_TRANSITIONS[self.state * DECK_SIZE + card]
+
+    def value(self):
+        """Calculate the value of the hand."""
+        return STATE_VALUES[self.state]
+
+    def is_soft(self):
+        """Returns True if the hand's value counts an Ace as 11."""
+        return STATE_SOFT[self.state]
+
+    def is_bust(self):
+        """Returns True if the hand is over 21."""
+        return STATE_VALUES[self.state] > 21
+
+    def is_blackjack(self):
+        """Returns True for a natural: 21 with the first two cards."""
+        return len(self.cards) == 2 and STATE_VALUES[self.state] == 21
+
+    def to_bytes(self):
+        """Returns the cards as bytes, e.g. for storing in a session."""
+        return bytes(self.cards)
@@ -0,0 +1,132 @@
+"""Card-counting simulation: bet by the count on a persistent shoe and measure the result.
+
+Shoes are played with table_sim. The running count at every point of a shoe is a
+prefix sum of the tag of each dealt card, looked up by card value, so keeping the
+count costs O(1) per card and the dealt cards are never rescanned.
+"""
+import numpy as np
+
+from rules import CLASSIC
+from table_sim import NOT_PLAYED, play_shoes
+
+COUNT_RANGE = 24  # Histograms cover counts from -COUNT_RANGE to +COUNT_RANGE
+
+
+class CountSystem:
+    """A counting system: the tag of each card value (index 1 for Aces up to 10)."""
+    __slots__ = ('name', 'tags', 'balanced')
+
+    def __init__(self, name, tags, balanced=True):
+        self.name = name
+        self.tags = tuple(tags)
+        self.balanced = balanced
+
+    def __repr__(self):
+        return f"CountSystem({self.name!r})"
+
+    def initial_count(self, num_decks):
+        """Running count of a fresh shoe.
+
+        Balanced systems start at 0. Unbalanced ones start low enough that the count
+        ends at the same value for any number of decks (4 - 4 * num_decks for KO).
+        """
+        if self.balanced:
+            return 0
+        deck_total = 4 * sum(self.tags[1:]) + 12 * self.tags[10]
+        return -deck_total * (num_decks - 1)
+
+
+#                    -   A  2  3  4  5  6  7  8  9  10
+HI_LO = CountSystem("Hi-Lo", (0, -1, 1, 1, 1, 1, 1, 0, 0, 0, -1))
+KO = CountSystem("KO", (0, -1, 1, 1, 1, 1, 1, 1, 0, 0, -1), balanced=False)
+OMEGA_II = CountSystem("Omega II", (0, 0, 1, 1, 2, 2, 2, 1, 0, -1, -2))
+SYSTEMS = {system.name: system for system in (HI_LO, KO, OMEGA_II)}
+
+# Units bet from each count up; below the lowest count the minimum bet of 1 unit
+DEFAULT_RAMP = {1: 1, 2: 2, 3: 4, 4: 6, 5: 8}
+
+
+def bet_units(count, ramp):
+    """Vectorized bet-spread lookup: units bet at each count under a {count: units} ramp."""
+    thresholds = np.array(sorted(ramp))
+    units = np.array([ramp[threshold] for threshold in thresholds], dtype=np.float64)
+    step = np.searchsorted(thresholds, count, side="right") - 1
+    return np.where(step < 0, 1.0, units[np.maximum(step, 0)])
+
+
+def count_index(system, running, cards_left):
+    """Returns the count bets are keyed on.
+
+    That is the true count (running count per deck left, floored) for balanced
+    systems, and the running count itself for unbalanced ones like KO.
+    """
+    if system.balanced:
+        return np.floor(running / np.maximum(cards_left / 52, 0.5)).astype(np.int64)
+    return running.astype(np.int64)
+
+
+def simulate_counting(num_shoes, system=HI_LO, ramp=None, seats=1, num_decks=6, penetration=0.75,
+                      policies=None, rng=None, batch_size=2_000, rules=CLASSIC):
+    """Plays num_shoes shoes betting by the count and reports the results.
+
+    Every seat bets by the ramp on the count at the start of each round, and the
+    round's payout under rules (see rules.py) is scaled by the bet. Returns a dict with the hands played, units bet and
+    won, EV per hand and per unit bet, the variance per hand, and per-count
+    histograms: "hands_by_count" and "ev_by_count" (units won per unit bet).
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+    ramp = DEFAULT_RAMP if ramp is None else ramp
+    tags = np.array(system.tags, dtype=np.int16)
+    shoe_size = num_decks * 52
+    bins = 2 * COUNT_RANGE + 1
+
+    hands = 0
+    bet = won = won_squared = 0.0
+    hands_by_count = np.zeros(bins, dtype=np.int64)
+    bet_by_count = np.zeros(bins)
+    won_by_count = np.zeros(bins)
+
+    remaining = num_shoes
+    while remaining > 0:
+        size = min(batch_size, remaining)
+        net, start, cards = play_shoes(size, rng, seats, num_decks, penetration, policies, rules)
+        remaining -= size
+
+        # running[shoe, n] is the count after the first n cards of the shoe
+        running = np.zeros((size, shoe_size + 1), dtype=np.int32)
+        np.cumsum(tags[cards[:, :shoe_size]], axis=1, out=running[:, 1:])
+        running += system.initial_count(num_decks)
+
+        played = start != NOT_PLAYED
+        shoe, round_index = np.nonzero(played)
+        position = start[shoe, round_index]
+        index = count_index(system, running[shoe, position], shoe_size - position)
+        units = bet_units(index, ramp)
+
+        payout = net[shoe, round_index] * units[:, None]  # (rounds, seats)
+
+        hands += payout.size
+        bet += units.sum() * seats
+        won += payout.sum()
+        won_squared += (payout ** 2).sum()
+        count_bin = np.clip(index, -COUNT_RANGE, COUNT_RANGE) + COUNT_RANGE
+        hands_by_count += np.bincount(count_bin, minlength=bins) * seats
+        bet_by_count += np.bincount(count_bin, weights=units, minlength=bins) * seats
+        won_by_count += np.bincount(count_bin, weights=payout.sum(axis=1), minlength=bins)
+
+    ev_per_hand = won / hands
+    counts = range(-COUNT_RANGE, COUNT_RANGE + 1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        ev_by_count = won_by_count / bet_by_count
+    return {
+        "system": system.name,
+        "hands": hands,
+        "units_bet": bet,
+        "units_won": won,
+        "ev_per_hand": ev_per_hand,
+        "ev_per_unit": won / bet,
+        "variance_per_hand": won_squared / hands - ev_per_hand ** 2,
+        "hands_by_count": dict(zip(counts, hands_by_count.tolist())),
+        "ev_by_count": dict(zip(counts, ev_by_count.tolist())),
+    }
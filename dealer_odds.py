@@ -0,0 +1,105 @@
+"""Exact probabilities of the dealer's final total, computed from the remaining shoe.
+
+By default the dealer draws to 17 and stands on any 17, as in dealer_turn and
+play_blackjack; a RuleSet (see rules.py) can make the dealer hit soft 17 instead.
+A shoe composition is a tuple of 10 card counts by value: Aces, 2-9, then all
+ten-valued cards. Results are dicts over DEALER_OUTCOMES; a natural (Ace and
+ten-valued card as the first two cards) is reported as "blackjack", not 21.
+"""
+from functools import lru_cache
+
+from cards import EMPTY_HAND, MAX_HARD, STATE_VALUES
+from rules import CLASSIC, compile_rules
+
+DEALER_OUTCOMES = (17, 18, 19, 20, 21, "bust", "blackjack")
+CACHE_SIZE = 1 << 18
+
+
+def full_shoe(num_decks=1):
+    """Returns the composition of num_decks full decks."""
+    return (4 * num_decks,) * 9 + (16 * num_decks,)
+
+
+def _add_value(state, value):
+    """Hand state (see cards.add_card) after adding a card of the given value."""
+    hard, has_ace = divmod(state, 2)
+    return min(hard + value, MAX_HARD) * 2 + (has_ace or value == 1)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _finish(state, counts, hits):
+    """Probabilities of ending on 17-21 or busting, as a tuple, from a hand state and shoe.
+
+    hits is the dealer's compiled hit/stand table (RuleTables.dealer_hits).
+    """
+    total = STATE_VALUES[state]
+    if total > 21:
+        return (0.0,) * 5 + (1.0,)
+    if not hits[state]:
+        return tuple(float(total == final) for final in range(17, 22)) + (0.0,)
+
+    probabilities = [0.0] * 6
+    remaining = sum(counts)
+    for index, count in enumerate(counts):
+        if count:
+            drawn = counts[:index] + (count - 1,) + counts[index + 1:]
+            weight = count / remaining
+            for outcome, p in enumerate(_finish(_add_value(state, index + 1), drawn, hits)):
+                probabilities[outcome] += weight * p
+    return tuple(probabilities)
+
+
+def _distribution(upcard, counts, hits):
+    """Outcome probabilities as a tuple in DEALER_OUTCOMES order."""
+    upstate = _add_value(EMPTY_HAND, upcard)
+    probabilities = [0.0] * 7
+    remaining = sum(counts)
+    for index, count in enumerate(counts):
+        if not count:
+            continue
+        weight = count / remaining
+        state = _add_value(upstate, index + 1)
+        if STATE_VALUES[state] == 21:
+            probabilities[6] += weight
+            continue
+        drawn = counts[:index] + (count - 1,) + counts[index + 1:]
+        for outcome, p in enumerate(_finish(state, drawn, hits)):
+            probabilities[outcome] += weight * p
+    return tuple(probabilities)
+
+
+@lru_cache(maxsize=None)
+def full_shoe_table(num_decks=1, rules=CLASSIC):
+    """Precomputed distributions for every upcard (1-10) dealt from a full shoe."""
+    hits = compile_rules(rules).dealer_hits
+    shoe = full_shoe(num_decks)
+    table = {}
+    for upcard in range(1, 11):
+        counts = shoe[:upcard - 1] + (shoe[upcard - 1] - 1,) + shoe[upcard:]
+        table[upcard] = _distribution(upcard, counts, hits)
+    return table
+
+
+def dealer_probabilities(upcard, counts=None, num_decks=1, no_blackjack=False, rules=CLASSIC):
+    """Returns the distribution of the dealer's final total for an upcard value (Ace = 1).
+
+    counts is the composition the hole card and draws come from, with the upcard
+    already removed; it defaults to a full shoe of num_decks decks. With
+    no_blackjack=True the distribution is conditioned on the dealer not holding
+    a natural, as when the player only gets to act after the naturals are checked.
+    rules decides whether the dealer hits soft 17.
+    """
+    if counts is None:
+        probabilities = full_shoe_table(num_decks, rules)[upcard]
+    else:
+        probabilities = _distribution(upcard, tuple(counts), compile_rules(rules).dealer_hits)
+
+    if no_blackjack:
+        scale = 1.0 - probabilities[6]
+        probabilities = tuple(p / scale for p in probabilities[:6]) + (0.0,)
+    return dict(zip(DEALER_OUTCOMES, probabilities))
+
+
+def cache_info():
+    """Hit/miss statistics of the composition cache."""
+    return _finish.cache_info()
@@ -0,0 +1,85 @@
+"""Server-side storage for web game state, keyed by a short session id.
+
+A game is a small JSON-compatible dict. Stores expire games that haven't been
+saved for ttl seconds.
+"""
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+class MemoryGameStore:
+    """Keeps games in process memory, evicting the least recently used beyond max_games."""
+
+    def __init__(self, max_games=100_000, ttl=3600):
+        self.max_games = max_games
+        self.ttl = ttl
+        self._games = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, sid):
+        with self._lock:
+            entry = self._games.get(sid)
+            if entry is None:
+                return None
+            saved, game = entry
+            if time.monotonic() - saved > self.ttl:
+                del self._games[sid]
+                return None
+            self._games.move_to_end(sid)
+            return game
+
+    def put(self, sid, game):
+        with self._lock:
+            self._games[sid] = (time.monotonic(), game)
+            self._games.move_to_end(sid)
+            while len(self._games) > self.max_games:
+                self._games.popitem(last=False)
+
+    def delete(self, sid):
+        with self._lock:
+            self._games.pop(sid, None)
+
+
+class SQLiteGameStore:
+    """Keeps games as JSON in an SQLite table, so they survive restarts and are shared between processes."""
+
+    PURGE_EVERY = 1000  # Saves between sweeps for expired games
+
+    def __init__(self, path="games.sqlite3", ttl=3600):
+        self.ttl = ttl
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS games "
+                         "(sid TEXT PRIMARY KEY, game TEXT NOT NULL, saved REAL NOT NULL)")
+        self._lock = threading.Lock()
+        self._puts = 0
+
+    def get(self, sid):
+        with self._lock:
+            row = self._db.execute("SELECT game FROM games WHERE sid = ? AND saved > ?",
+                                   (sid, time.time() - self.ttl)).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def put(self, sid, game):
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO games VALUES (?, ?, ?)",
+                             (sid, json.dumps(game, separators=(",", ":")), time.time()))
+            self._puts += 1
+            if self._puts % self.PURGE_EVERY == 0:
+                self._db.execute("DELETE FROM games WHERE saved <= ?", (time.time() - self.ttl,))
+
+    def delete(self, sid):
+        with self._lock:
+            self._db.execute("DELETE FROM games WHERE sid = ?", (sid,))
+
+
+def make_store(url="memory"):
+    """Creates a store from a URL: 'memory' or 'sqlite:<path>'."""
+    if url == "memory":
+        return MemoryGameStore()
+    if url.startswith("sqlite:"):
+        return SQLiteGameStore(url[len("sqlite:"):])
+    raise ValueError(f"Unknown game store {url!r}. Use 'memory' or 'sqlite:<path>'.")
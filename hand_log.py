@@ -0,0 +1,192 @@
+"""Append-only binary hand-history log, with a memory-mapped reader.
+
+A log file is a 16-byte header followed by fixed-width records (RECORD_DTYPE),
+one per round. Each record holds the seed and round number it came from, the
+player's cards then the dealer's cards, the player's decisions, the outcome and
+the payout. Writers buffer records and append them in bulk with O_APPEND, so
+several processes can share one file without splitting records; read_log()
+maps the file into a NumPy structured array without copying it.
+
+Decisions are stored as the player's first action (rules.STAND, HIT, DOUBLE,
+SURRENDER, or SPLIT) and the number of cards the player drew after the first
+two: a hit/stand player hits that many times, then stands unless the hand ended.
+"""
+import os
+import struct
+
+import numpy as np
+
+from batch_engine import OUTCOMES
+from rules import HIT, STAND
+
+MAGIC = b"BJHANDS\x01"
+HEADER = struct.Struct("<8sII")  # magic, record size, reserved
+MAX_CARDS = 26  # Cards kept per record; longer rounds are truncated and flagged
+NO_CARD = 0xFF
+OUTCOME_CODES = {outcome: code for code, outcome in enumerate(OUTCOMES)}
+SEED_MASK = (1 << 64) - 1
+
+# Record flags
+CARD_VALUES = 1  # Cards are Blackjack values 1-10 rather than card ints 0-51
+TRUNCATED = 2  # The round dealt more than MAX_CARDS cards
+
+RECORD_DTYPE = np.dtype([
+    ("seed", "<u8"),
+    ("round", "<u4"),
+    ("payout", "<f4"),  # Units the player won on a one-unit bet
+    ("cards", "u1", (MAX_CARDS,)),  # The player's cards, then the dealer's; NO_CARD after the last
+    ("num_cards", "u1"),
+    ("player_cards", "u1"),  # How many of the cards are the player's
+    ("action", "u1"),
+    ("draws", "u1"),
+    ("outcome", "u1"),  # Index into batch_engine.OUTCOMES
+    ("flags", "u1"),
+])
+
+
+class HandLog:
+    """Buffers hand records and appends them to a log file in bulk.
+
+    seed is stored in every record written without an explicit one, and rounds
+    are numbered on from first_round. Use it as a context manager, or call close(),
+    to write out the last records.
+    """
+
+    def __init__(self, path, seed=0, first_round=0, buffer_records=1 << 16):
+        self.path = path
+        self.seed = seed & SEED_MASK
+        self.next_round = first_round
+        self._buffer = np.zeros(buffer_records, dtype=RECORD_DTYPE)
+        self._used = 0
+        try:
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+            _write_all(fd, HEADER.pack(MAGIC, RECORD_DTYPE.itemsize, 0))
+            os.close(fd)
+        except FileExistsError:
+            _check_header(path)
+        self._fd = os.open(path, os.O_WRONLY | os.O_APPEND)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def append(self, player_cards, dealer_cards, outcome, payout=None, action=None, seed=None,
+               round_number=None, flags=0):
+        """Adds one round, given its hands as sequences of card ints (or values, with CARD_VALUES)."""
+        if self._used == len(self._buffer):
+            self.flush()
+        record = self._buffer[self._used]
+        self._used += 1
+        cards = list(player_cards) + list(dealer_cards)
+        if len(cards) > MAX_CARDS:
+            cards = cards[:MAX_CARDS]
+            flags |= TRUNCATED
+        record["cards"] = NO_CARD
+        record["cards"][:len(cards)] = cards
+        record["num_cards"] = len(cards)
+        record["player_cards"] = min(len(player_cards), MAX_CARDS)
+        record["draws"] = len(player_cards) - 2
+        if action is None:
+            action = HIT if len(player_cards) > 2 else STAND
+        record["action"] = action
+        record["outcome"] = outcome
+        record["payout"] = payout if payout is not None else (outcome == 0) - (outcome == 1)
+        record["seed"] = self.seed if seed is None else seed & SEED_MASK
+        record["round"] = self.next_round if round_number is None else round_number
+        record["flags"] = flags
+        self.next_round += 1
+
+    def extend(self, records):
+        """Adds a structured array of RECORD_DTYPE records as they are."""
+        self.flush()
+        _write_all(self._fd, np.ascontiguousarray(records, dtype=RECORD_DTYPE).data)
+
+    def write_batch(self, decks, pointer, draws, action, net):
+        """Adds the rounds of a single-seat batch, numbering them on from next_round (see batch_records)."""
+        self.extend(batch_records(decks, pointer, draws, action, net, self.seed, self.next_round))
+        self.next_round += len(net)
+
+    def flush(self):
+        if self._used:
+            _write_all(self._fd, self._buffer[:self._used].data)
+            self._used = 0
+
+    def close(self):
+        if self._fd is not None:
+            self.flush()
+            os.close(self._fd)
+            self._fd = None
+
+
+def _write_all(fd, data):
+    """Writes all of data, retrying short writes, so no record is ever left half written."""
+    data = memoryview(data).cast("B")
+    while data:
+        written = os.write(fd, data)
+        if not written:
+            raise OSError(f"Could not write to the hand log: wrote 0 of {len(data)} bytes.")
+        data = data[written:]
+
+
+def batch_records(decks, pointer, draws, action, net, seed, first_round):
+    """Builds one record per row of a single-seat batch (see batch_engine.play_batch).
+
+    decks[row, :pointer[row]] are the values dealt in order: player, dealer, player,
+    dealer, then the player's draws[row] cards, then the dealer's.
+    """
+    num_rows = decks.shape[0]
+    records = np.zeros(num_rows, dtype=RECORD_DTYPE)
+    slot = np.arange(MAX_CARDS)
+    first_dealer = 2 + draws[:, None]
+    # Where each record slot's card sits in the dealing order
+    source = np.where(slot < 2, 2 * slot,
+                      np.where(slot < first_dealer, slot + 2,
+                               np.where(slot == first_dealer, 1,
+                                        np.where(slot == first_dealer + 1, 3, slot))))
+    source = np.minimum(source, decks.shape[1] - 1)
+    num_cards = np.minimum(pointer, MAX_CARDS)
+    cards = np.take_along_axis(decks, source, axis=1).astype(np.uint8)
+    cards[slot >= num_cards[:, None]] = NO_CARD
+
+    records["seed"] = seed & SEED_MASK
+    records["round"] = first_round + np.arange(num_rows)
+    records["payout"] = net
+    records["cards"] = cards
+    records["num_cards"] = num_cards
+    records["player_cards"] = np.minimum(2 + draws, MAX_CARDS)
+    records["action"] = action
+    records["draws"] = draws
+    records["outcome"] = np.where(net > 0, 0, np.where(net < 0, 1, 2))
+    records["flags"] = CARD_VALUES | np.where(pointer > MAX_CARDS, TRUNCATED, 0)
+    return records
+
+
+def _check_header(path):
+    with open(path, "rb") as f:
+        header = f.read(HEADER.size)
+    if len(header) < HEADER.size:
+        raise ValueError(f"{path} is not a hand log: it has no header.")
+    magic, record_size, _ = HEADER.unpack(header)
+    if magic != MAGIC or record_size != RECORD_DTYPE.itemsize:
+        raise ValueError(f"{path} is not a hand log in this format.")
+
+
+def read_log(path):
+    """Memory-maps a log as a read-only structured array of RECORD_DTYPE records.
+
+    A partly written record at the end of the file (from a writer that is still
+    running, or crashed) is left out.
+    """
+    _check_header(path)
+    count = (os.path.getsize(path) - HEADER.size) // RECORD_DTYPE.itemsize
+    if count == 0:
+        return np.zeros(0, dtype=RECORD_DTYPE)
+    return np.memmap(path, dtype=RECORD_DTYPE, mode="r", offset=HEADER.size, shape=(count,))
+
+
+def hands(record):
+    """Splits a record's cards into (player's cards, dealer's cards) lists."""
+    cards = record["cards"][:record["num_cards"]].tolist()
+    return cards[:record["player_cards"]], cards[record["player_cards"]:]
@@ -0,0 +1,163 @@
+"""Request metrics and sampling profiler for the Flask app.
+
+init_app() installs request hooks that record per-route latency, session cookie
+sizes and template render time as histograms, served at /metrics in the
+Prometheus text format; the app adds the size of each game state it saves, which
+is where the state lives now that the cookie only holds a game id. With
+profile_every=N it also runs cProfile on one request in N and dumps a pstats
+file per sampled request. Nothing is installed unless
+enabled, so a disabled app runs exactly as before.
+
+    BLACKJACK_METRICS=1 BLACKJACK_PROFILE_EVERY=100 python app.py
+    python -m pstats profiles/index-...pstats
+"""
+import bisect
+import cProfile
+import itertools
+import os
+import threading
+import time
+
+from flask import Response, current_app, g, request, session
+from flask.signals import before_render_template, template_rendered
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+SIZE_BUCKETS = (16, 32, 64, 128, 256, 512, 1024, 2048, 4096)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Histogram:
+    """A Prometheus histogram with one set of cumulative buckets per label value tuple."""
+
+    def __init__(self, name, help_text, label_names, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        self._series = {}  # labels -> [bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 2)
+            series[index] += 1
+            series[-1] += value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = {labels: list(values) for labels, values in self._series.items()}
+        for labels, values in sorted(series.items()):
+            label_text = ",".join(f'{name}="{value}"' for name, value in zip(self.label_names, labels))
+            prefix = label_text + "," if label_text else ""
+            total = 0
+            for bound, count in zip(self.buckets + ("+Inf",), values):
+                total += count
+                lines.append(f'{self.name}_bucket{{{prefix}le="{bound}"}} {total}')
+            lines.append(f"{self.name}_sum{{{label_text}}} {values[-1]}")
+            lines.append(f"{self.name}_count{{{label_text}}} {total}")
+        return lines
+
+
+class Metrics:
+    """The app's histograms, plus the optional 1-in-N request profiler."""
+
+    def __init__(self, profile_every=0, profile_dir="profiles"):
+        self.latency = Histogram("blackjack_request_seconds", "Request latency by route.",
+                                 ("endpoint", "method", "status"), LATENCY_BUCKETS)
+        self.cookie_size = Histogram("blackjack_session_cookie_bytes",
+                                     "Size of the session cookie received and set.",
+                                     ("direction",), SIZE_BUCKETS)
+        self.game_size = Histogram("blackjack_game_state_bytes",
+                                   "Size of the game state saved to the store, as JSON.", (), SIZE_BUCKETS)
+        self.render = Histogram("blackjack_render_seconds", "Template render time.",
+                                ("template",), LATENCY_BUCKETS)
+        self.profile_every = profile_every
+        self.profile_dir = profile_dir
+        self._requests = itertools.count(1)
+        self._profiling = threading.Lock()  # cProfile can only run one profile at a time
+        self.receivers = ()
+
+    def render_text(self):
+        lines = []
+        for histogram in (self.latency, self.cookie_size, self.game_size, self.render):
+            lines.extend(histogram.render())
+        return "\n".join(lines) + "\n"
+
+    def before_request(self):
+        g.metrics_start = time.perf_counter()
+        if self.profile_every and next(self._requests) % self.profile_every == 0:
+            if self._profiling.acquire(blocking=False):
+                g.metrics_profile = profile = cProfile.Profile()
+                profile.enable()
+
+    def after_request(self, response, session_cookie):
+        endpoint = request.endpoint or "unmatched"
+        self.latency.observe(time.perf_counter() - g.metrics_start, endpoint, request.method,
+                             str(response.status_code))
+        received = request.cookies.get(session_cookie)
+        if received is not None:
+            self.cookie_size.observe(len(received), "received")
+        if session.modified and session:
+            # The cookie itself is only written after this hook, so size what it will hold
+            serializer = current_app.session_interface.get_signing_serializer(current_app)
+            self.cookie_size.observe(len(serializer.dumps(dict(session))), "set")
+
+        profile = g.pop("metrics_profile", None)
+        if profile is not None:
+            profile.disable()
+            self._profiling.release()
+            os.makedirs(self.profile_dir, exist_ok=True)
+            name = f"{endpoint}-{time.strftime('%Y%m%d-%H%M%S')}-{time.perf_counter_ns()}.pstats"
+            profile.dump_stats(os.path.join(self.profile_dir, name))
+        return response
+
+    def teardown_request(self, error):
+        # A request that raised never reaches after_request; don't leave its profiler running
+        profile = g.pop("metrics_profile", None)
+        if profile is not None:
+            profile.disable()
+            self._profiling.release()
+
+
+def init_app(app, enabled=None, profile_every=None, profile_dir=None):
+    """Instruments app and adds /metrics when enabled; returns the Metrics, or None if disabled.
+
+    Settings default to the BLACKJACK_METRICS, BLACKJACK_PROFILE_EVERY and
+    BLACKJACK_PROFILE_DIR environment variables. Profiling on its own also
+    enables the metrics.
+    """
+    if profile_every is None:
+        profile_every = int(os.environ.get("BLACKJACK_PROFILE_EVERY", "0"))
+    if enabled is None:
+        enabled = os.environ.get("BLACKJACK_METRICS", "") not in ("", "0") or profile_every > 0
+    if not enabled:
+        return None
+    metrics = Metrics(profile_every, profile_dir or os.environ.get("BLACKJACK_PROFILE_DIR", "profiles"))
+    session_cookie = app.config["SESSION_COOKIE_NAME"]
+
+    app.before_request(metrics.before_request)
+    app.after_request(lambda response: metrics.after_request(response, session_cookie))
+    app.teardown_request(metrics.teardown_request)
+
+    def render_started(sender, template, context, **extra):
+        g.metrics_render_start = time.perf_counter()
+
+    def render_finished(sender, template, context, **extra):
+        start = g.pop("metrics_render_start", None)
+        if start is not None:
+            metrics.render.observe(time.perf_counter() - start, template.name or "string")
+
+    # Signal receivers are held weakly, so the Metrics keeps them alive
+    metrics.receivers = (render_started, render_finished)
+    before_render_template.connect(render_started, app)
+    template_rendered.connect(render_finished, app)
+
+    @app.route("/metrics")
+    def prometheus_metrics():
+        return Response(metrics.render_text(), content_type=CONTENT_TYPE)
+
+    return metrics
@@ -0,0 +1,93 @@
+"""Per-round statistics for the simulators, kept in preallocated NumPy counters.
+
+A RoundStats is filled a batch at a time by the NumPy engine (with bincount, so
+the cost per batch is a few array passes) or a round at a time by play_blackjack.
+Engines that aren't given one skip the bookkeeping entirely. Collectors merge by
+adding their counters, so each worker process can fill its own:
+
+    stats = RoundStats()
+    monte_carlo_simulation(1_000_000, engine="numpy", workers=4, stats=stats)
+    stats.summary()["dealer_bust_rate"]
+"""
+import numpy as np
+
+from cards import MAX_HARD
+
+MAX_DRAWS = 20  # Rounds where the player drew more cards are counted at MAX_DRAWS
+NUM_UPCARDS = 11  # Upcard values 1-10, index 0 unused
+NUM_TOTALS = MAX_HARD + 1
+NATURALS = ("player", "dealer", "both")
+
+
+class RoundStats:
+    """Counters describing the rounds played, indexed by upcard value, card count or hand total.
+
+    Only the player's first hand counts towards player_totals when a hand is split;
+    player_draws counts every card the player drew after the first two.
+    """
+    __slots__ = ('rounds', 'naturals', 'dealer_turns', 'dealer_busts', 'player_draws', 'player_totals',
+                 'dealer_totals')
+
+    def __init__(self):
+        self.rounds = 0
+        self.naturals = np.zeros(len(NATURALS), dtype=np.int64)
+        self.dealer_turns = np.zeros(NUM_UPCARDS, dtype=np.int64)  # Rounds the dealer played out, by upcard
+        self.dealer_busts = np.zeros(NUM_UPCARDS, dtype=np.int64)
+        self.player_draws = np.zeros(MAX_DRAWS + 1, dtype=np.int64)
+        self.player_totals = np.zeros(NUM_TOTALS, dtype=np.int64)
+        self.dealer_totals = np.zeros(NUM_TOTALS, dtype=np.int64)  # Only rounds the dealer played out
+
+    def record_batch(self, upcard, draws, player_score, dealer_score, dealer_played, player_natural,
+                     dealer_natural):
+        """Counts a batch of rounds, given one array entry per round."""
+        self.rounds += len(upcard)
+        self.naturals += (np.count_nonzero(player_natural), np.count_nonzero(dealer_natural),
+                          np.count_nonzero(player_natural & dealer_natural))
+        played_upcard = upcard[dealer_played]
+        played_score = dealer_score[dealer_played]
+        self.dealer_turns += np.bincount(played_upcard, minlength=NUM_UPCARDS)
+        self.dealer_busts += np.bincount(played_upcard[played_score > 21], minlength=NUM_UPCARDS)
+        self.dealer_totals += np.bincount(played_score, minlength=NUM_TOTALS)
+        self.player_draws += np.bincount(np.minimum(draws, MAX_DRAWS), minlength=MAX_DRAWS + 1)
+        self.player_totals += np.bincount(player_score, minlength=NUM_TOTALS)
+
+    def record_round(self, upcard, draws, player_score, dealer_score, dealer_played, player_natural,
+                     dealer_natural):
+        """Counts a single round, given scalars."""
+        self.rounds += 1
+        if player_natural or dealer_natural:
+            self.naturals += (bool(player_natural), bool(dealer_natural), player_natural and dealer_natural)
+        if dealer_played:
+            self.dealer_turns[upcard] += 1
+            self.dealer_busts[upcard] += dealer_score > 21
+            self.dealer_totals[dealer_score] += 1
+        self.player_draws[min(draws, MAX_DRAWS)] += 1
+        self.player_totals[player_score] += 1
+
+    def merge(self, other):
+        """Adds another collector's counts to this one and returns it."""
+        self.rounds += other.rounds
+        for name in self.__slots__[1:]:
+            getattr(self, name)[:] += getattr(other, name)
+        return self
+
+    def summary(self):
+        """Returns the rates derived from the counters: per round, and dealer busts per upcard."""
+        rounds = max(self.rounds, 1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            bust_rate = self.dealer_busts / self.dealer_turns
+        return {
+            "rounds": self.rounds,
+            "natural_rate": dict(zip(NATURALS, (self.naturals / rounds).tolist())),
+            "dealer_bust_rate": {upcard: float(bust_rate[upcard]) for upcard in range(1, NUM_UPCARDS)},
+            "mean_player_draws": float(self.player_draws @ np.arange(MAX_DRAWS + 1)) / rounds,
+        }
+
+    def to_dict(self):
+        """Returns the counters as plain lists and ints, for JSON."""
+        return {"rounds": self.rounds,
+                **{name: getattr(self, name).tolist() for name in self.__slots__[1:]}}
+
+    def arrays(self):
+        """Returns the counters as NumPy arrays keyed by name, for np.savez."""
+        return {"rounds": np.array(self.rounds), **{name: getattr(self, name) for name in self.__slots__[1:]}}
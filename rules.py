@@ -0,0 +1,82 @@
+"""Blackjack rule sets, compiled into lookup tables the engines index instead of testing rule flags.
+
+CLASSIC is the game Simulation.py and app.py have always played: the dealer
+stands on all 17s, there is no doubling, splitting, surrender or insurance, a
+natural wins even money (even against a dealer natural) and reaching 21 by
+hitting wins outright.
+"""
+from functools import lru_cache
+from typing import NamedTuple
+
+from cards import NUM_STATES, STATE_SOFT, STATE_VALUES
+
+# First-decision actions of a Policy (see strategy.py)
+STAND, HIT, DOUBLE, SURRENDER = range(4)
+SPLIT = 4  # Recorded as the first action of a player who split (see hand_log.py)
+
+# What a player's hand total means once a card has been added (see RuleTables.hand_end)
+PLAY_ON, BUST, WIN = range(3)
+
+ANY_TWO_CARDS = tuple(range(4, 22))
+NINE_TO_ELEVEN = (9, 10, 11)
+TEN_OR_ELEVEN = (10, 11)
+
+
+class RuleSet(NamedTuple):
+    """One variant of the rules. Immutable and hashable, so it can key caches."""
+    dealer_hits_soft_17: bool = False  # H17 rather than S17
+    blackjack_payout: float = 1.0  # 1.5 for 3:2, 1.2 for 6:5
+    natural_beats_natural: bool = True  # A player natural wins against a dealer natural, else pushes
+    twenty_one_wins: bool = True  # Reaching 21 by hitting wins outright
+    double_on: tuple = ()  # Two-card totals the player may double on
+    double_after_split: bool = False
+    max_splits: int = 0  # 0 for no splitting, 3 to resplit up to four hands
+    hit_split_aces: bool = False  # Otherwise split Aces get one card each
+    late_surrender: bool = False  # Give up half the bet after the dealer checks for a natural
+    insurance: bool = False  # Side bet of half the bet against an Ace, paying 2:1
+
+
+CLASSIC = RuleSet()
+VEGAS_S17 = RuleSet(blackjack_payout=1.5, natural_beats_natural=False, twenty_one_wins=False,
+                    double_on=ANY_TWO_CARDS, double_after_split=True, max_splits=3,
+                    late_surrender=True, insurance=True)
+VEGAS_H17 = VEGAS_S17._replace(dealer_hits_soft_17=True)
+SIX_FIVE_H17 = VEGAS_H17._replace(blackjack_payout=1.2)
+RULE_SETS = {"classic": CLASSIC, "vegas-s17": VEGAS_S17, "vegas-h17": VEGAS_H17, "6:5-h17": SIX_FIVE_H17}
+
+
+class RuleTables:
+    """A RuleSet compiled into tables.
+
+    dealer_hits and can_double are indexed by hand state (see cards.add_card);
+    can_double_split applies to hands made by splitting. hand_end is indexed by
+    hand value (up to cards.MAX_HARD) and says whether the player plays on, has
+    bust or has won outright.
+    """
+    __slots__ = ('rules', 'dealer_hits', 'hand_end', 'can_double', 'can_double_split',
+                 'natural_payout', 'natural_vs_natural', 'max_hands', 'split_aces_one_card',
+                 'surrender', 'insurance')
+
+    def __init__(self, rules):
+        self.rules = rules
+        self.dealer_hits = bytes(
+            STATE_VALUES[state] < 17
+            or (rules.dealer_hits_soft_17 and STATE_VALUES[state] == 17 and STATE_SOFT[state])
+            for state in range(NUM_STATES))
+        self.hand_end = bytes(
+            BUST if value > 21 else WIN if value == 21 and rules.twenty_one_wins else PLAY_ON
+            for value in range(max(STATE_VALUES) + 1))
+        self.can_double = bytes(STATE_VALUES[state] in rules.double_on for state in range(NUM_STATES))
+        self.can_double_split = self.can_double if rules.double_after_split else bytes(NUM_STATES)
+        self.natural_payout = rules.blackjack_payout
+        self.natural_vs_natural = rules.blackjack_payout if rules.natural_beats_natural else 0.0
+        self.max_hands = rules.max_splits + 1
+        self.split_aces_one_card = not rules.hit_split_aces
+        self.surrender = rules.late_surrender
+        self.insurance = rules.insurance
+
+
+@lru_cache(maxsize=None)
+def compile_rules(rules=CLASSIC):
+    """Returns the RuleTables for a RuleSet, compiling each rule set only once."""
+    return RuleTables(rules)
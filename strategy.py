@@ -0,0 +1,213 @@
+"""Playing policies for the simulator, including an EV-optimal basic strategy solver.
+
+A Policy is a hit/stand table indexed by [player total, soft flag, dealer upcard
+value] (Ace = 1). Both play_blackjack and the NumPy batch engine accept one. For
+rule sets with doubling, surrender or splits (see rules.py) it also carries the
+action for a hand's first two cards and a split table indexed by [pair value, upcard].
+"""
+import hashlib
+import json
+import os
+from functools import lru_cache
+
+from cards import MAX_HARD
+from dealer_odds import dealer_probabilities, full_shoe
+from rules import BUST, CLASSIC, DOUBLE, HIT, PLAY_ON, STAND, SURRENDER, WIN, compile_rules
+
+NUM_UPCARDS = 11  # Upcard values 1-10, index 0 unused
+POLICY_SHAPE = (MAX_HARD + 1, 2, NUM_UPCARDS)
+NUM_CELLS = POLICY_SHAPE[0] * POLICY_SHAPE[1] * POLICY_SHAPE[2]
+# (total, soft) pairs a player can face a decision on
+DECISIONS = [(total, 0) for total in range(4, 22)] + [(total, 1) for total in range(12, 22)]
+NUM_PAIRS = NUM_UPCARDS * NUM_UPCARDS  # Split table cells: pair values 1-10 by upcard
+ACTION_LETTERS = "SHDR"  # STAND, HIT, DOUBLE, SURRENDER
+PAIR_NAMES = ("A",) + tuple(str(value) for value in range(2, 11))
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache")
+SOLVER_VERSION = 2  # Part of every cache file name; bump when the solver or Policy format changes
+
+
+class Policy:
+    """Decision tables stored as one byte per cell.
+
+    hits is the hit/stand table. actions holds the STAND/HIT/DOUBLE/SURRENDER
+    choice for a hand's first two cards and defaults to hits; where the rules
+    forbid the action, the engines fall back to hits. splits marks the pairs to
+    split, and insure takes insurance whenever it is offered.
+    """
+    __slots__ = ('name', 'hits', 'actions', 'splits', 'insure')
+
+    def __init__(self, name, hits, actions=None, splits=None, insure=False):
+        self.name = name
+        self.hits = bytes(hits)
+        self.actions = self.hits if actions is None else bytes(actions)
+        self.splits = bytes(NUM_PAIRS) if splits is None else bytes(splits)
+        self.insure = insure
+
+    def __repr__(self):
+        return f"Policy({self.name!r})"
+
+    def should_hit(self, total, soft, upcard):
+        """Returns True if the policy hits the given total against the dealer's upcard value."""
+        return self.hits[(total * 2 + soft) * NUM_UPCARDS + upcard] == 1
+
+    def first_action(self, total, soft, upcard):
+        """Returns the action (see rules.py) for a hand's first two cards."""
+        return self.actions[(total * 2 + soft) * NUM_UPCARDS + upcard]
+
+    def should_split(self, pair_value, upcard):
+        """Returns True if the policy splits a pair of the given card value."""
+        return self.splits[pair_value * NUM_UPCARDS + upcard] == 1
+
+    def save(self, path):
+        """Writes the policy as a readable JSON chart of strings, one per total, with a letter per upcard.
+
+        "hard" and "soft" hold H/S for hit/stand, "first" the S/H/D/R action on the
+        first two cards, and "pairs" Y/N for splitting.
+        """
+        upcards = range(1, NUM_UPCARDS)
+        chart = {"name": self.name, "insure": self.insure, "hard": {}, "soft": {}, "first": {}, "pairs": {}}
+        for total, soft in DECISIONS:
+            chart["soft" if soft else "hard"][str(total)] = "".join(
+                "H" if self.should_hit(total, soft, upcard) else "S" for upcard in upcards)
+            chart["first"][f"{'soft' if soft else 'hard'} {total}"] = "".join(
+                ACTION_LETTERS[self.first_action(total, soft, upcard)] for upcard in upcards)
+        for value, pair in enumerate(PAIR_NAMES, start=1):
+            chart["pairs"][pair] = "".join("Y" if self.should_split(value, upcard) else "N" for upcard in upcards)
+        with open(path, "w") as f:
+            json.dump(chart, f, indent=2)
+
+    @classmethod
+    def load(cls, path):
+        """Reads a policy written by save(); charts without "first" or "pairs" only hit or stand."""
+        with open(path) as f:
+            chart = json.load(f)
+        hits = bytearray(NUM_CELLS)
+        for soft, rows in ((0, chart["hard"]), (1, chart["soft"])):
+            for total, row in rows.items():
+                for upcard, action in enumerate(row, start=1):
+                    hits[(int(total) * 2 + soft) * NUM_UPCARDS + upcard] = action == "H"
+        actions = None
+        if "first" in chart:
+            actions = bytearray(NUM_CELLS)
+            for hand, row in chart["first"].items():
+                kind, total = hand.split()
+                for upcard, action in enumerate(row, start=1):
+                    cell = (int(total) * 2 + (kind == "soft")) * NUM_UPCARDS + upcard
+                    actions[cell] = ACTION_LETTERS.index(action)
+        splits = bytearray(NUM_PAIRS)
+        for value, pair in enumerate(PAIR_NAMES, start=1):
+            for upcard, split in enumerate(chart.get("pairs", {}).get(pair, ""), start=1):
+                splits[value * NUM_UPCARDS + upcard] = split == "Y"
+        return cls(chart["name"], hits, actions, splits, chart.get("insure", False))
+
+
+def threshold_policy(stand_on=17):
+    """The policy of Player.should_hit's default: hit any total below stand_on."""
+    hits = bytearray(NUM_CELLS)
+    for total, soft in DECISIONS:
+        for upcard in range(1, NUM_UPCARDS):
+            hits[(total * 2 + soft) * NUM_UPCARDS + upcard] = total < stand_on
+    return Policy(f"hit below {stand_on}", hits)
+
+
+def _stand_ev(total, dealer):
+    """Expected value of standing on total against a dealer outcome distribution."""
+    ev = dealer["bust"]
+    for final in range(17, 22):
+        if total > final:
+            ev += dealer[final]
+        elif total < final:
+            ev -= dealer[final]
+    return ev
+
+
+def solve_basic_strategy(num_decks=1, rules=CLASSIC):
+    """Computes the EV-optimal decisions for every (total, soft, upcard) under a RuleSet.
+
+    The player acts only after both naturals have been checked. The hit/stand
+    table covers hands of three or more cards; the first-decision table also
+    weighs doubling and surrender where the rules allow them, and the split table
+    compares two hands started from one card of the pair against playing the pair.
+    Dealer outcomes come from dealer_odds for a full shoe; the player's draws use
+    the full-shoe card frequencies (an infinite-deck approximation), and resplits
+    are not valued separately.
+    """
+    tables = compile_rules(rules)
+    shoe = full_shoe(num_decks)
+    draw_odds = [count / sum(shoe) for count in shoe]
+    hits = bytearray(NUM_CELLS)
+    actions = bytearray(NUM_CELLS)
+    splits = bytearray(NUM_PAIRS)
+
+    def total_of(hard, has_ace):
+        return min(hard + 10 if has_ace and hard <= 11 else hard, MAX_HARD)
+
+    for upcard in range(1, NUM_UPCARDS):
+        dealer = dealer_probabilities(upcard, num_decks=num_decks, no_blackjack=True, rules=rules)
+
+        def settled_ev(hard, has_ace):
+            """EV of a hand that takes no more cards."""
+            total = total_of(hard, has_ace)
+            end = tables.hand_end[total]
+            return -1.0 if end == BUST else 1.0 if end == WIN else _stand_ev(total, dealer)
+
+        def draw_ev(hard, has_ace, play):
+            """EV of drawing one card and then continuing with play(hard, has_ace)."""
+            return sum(p * play(hard + value, has_ace or value == 1)
+                       for value, p in enumerate(draw_odds, start=1))
+
+        @lru_cache(maxsize=None)
+        def best_ev(hard, has_ace):
+            """Returns (EV, hit?) for the best hit/stand play from a hand state."""
+            total = total_of(hard, has_ace)
+            if tables.hand_end[total] != PLAY_ON:
+                return settled_ev(hard, has_ace), False
+            stand = _stand_ev(total, dealer)
+            hit = draw_ev(hard, has_ace, lambda h, a: best_ev(h, a)[0])
+            return max(stand, hit), hit > stand
+
+        @lru_cache(maxsize=None)
+        def first_ev(hard, has_ace, after_split):
+            """Returns (EV, action) for the best play of a two-card hand."""
+            total = total_of(hard, has_ace)
+            if tables.hand_end[total] != PLAY_ON:
+                return settled_ev(hard, has_ace), STAND
+            options = {STAND: _stand_ev(total, dealer),
+                       HIT: draw_ev(hard, has_ace, lambda h, a: best_ev(h, a)[0])}
+            state = min(hard, MAX_HARD) * 2 + has_ace
+            if (tables.can_double_split if after_split else tables.can_double)[state]:
+                options[DOUBLE] = 2 * draw_ev(hard, has_ace, settled_ev)
+            if tables.surrender and not after_split:
+                options[SURRENDER] = -0.5
+            action = max(options, key=options.get)
+            return options[action], action
+
+        for total, soft in DECISIONS:
+            # A soft total holds an Ace counted as 11; a hard one plays the same with or without Aces
+            hard = total - 10 if soft else total
+            cell = (total * 2 + soft) * NUM_UPCARDS + upcard
+            hits[cell] = best_ev(hard, bool(soft))[1]
+            actions[cell] = first_ev(hard, bool(soft), False)[1]
+
+        if tables.max_hands > 1:
+            for value in range(1, NUM_UPCARDS):
+                if value == 1 and tables.split_aces_one_card:
+                    split = draw_ev(1, True, settled_ev)
+                else:
+                    split = draw_ev(value, value == 1, lambda h, a: first_ev(h, a, True)[0])
+                splits[value * NUM_UPCARDS + upcard] = 2 * split > first_ev(2 * value, value == 1, False)[0]
+
+    name = f"basic strategy ({num_decks} deck{'s' if num_decks > 1 else ''})"
+    return Policy(name, hits, actions, splits)
+
+
+def basic_strategy(num_decks=1, cache_dir=CACHE_DIR, rules=CLASSIC):
+    """Returns the basic strategy for num_decks, solving it only if it isn't cached on disk."""
+    suffix = "" if rules == CLASSIC else "_" + hashlib.sha256(repr(rules).encode()).hexdigest()[:12]
+    path = os.path.join(cache_dir, f"basic_strategy_v{SOLVER_VERSION}_{num_decks}{suffix}.json")
+    if os.path.exists(path):
+        return Policy.load(path)
+    policy = solve_basic_strategy(num_decks, rules)
+    os.makedirs(cache_dir, exist_ok=True)
+    policy.save(path)
+    return policy
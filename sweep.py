@@ -0,0 +1,227 @@
+"""Parameter sweeps over the NumPy engine, cached on disk and topped up incrementally.
+
+A grid maps each parameter (see PARAMETERS) to the values to try; every
+combination is a cell. A cell's rounds fall into fixed-size chunks, and each
+chunk into blocks on a fixed grid of BLOCK_SIZE rounds, so any n splits into the
+same pieces: whole blocks, then a last partial block. Piece (chunk, offset, size)
+is seeded from exactly that, and the counts of every piece are cached under a
+hash of the cell's config and seed. A cell's results for n are therefore the same
+however they were built up. Raising n plays only the missing blocks, and adding a
+value to the grid plays only its cells. The cache directory is kept under a size
+limit by evicting the least recently used cells.
+
+    python sweep.py --threshold 12-20 --decks 1 6 --rules classic vegas-s17 -n 1000000 --workers 4
+"""
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import batch_engine
+from rules import RULE_SETS
+from strategy import CACHE_DIR, threshold_policy
+
+PARAMETERS = {"threshold": 17, "decks": 1, "rules": "classic"}  # Defaults of every cell parameter
+CHUNK_SIZE = 100_000  # Rounds per cached chunk
+BLOCK_SIZE = 10_000  # Rounds per piece of a chunk; a larger n replays at most one partial block
+MAX_CACHE_BYTES = 64 * 1024 * 1024
+SWEEP_CACHE_DIR = os.path.join(CACHE_DIR, "sweep")
+RESULT_KEYS = batch_engine.OUTCOMES + ("Units", "UnitsSquared")
+
+
+def grid_cells(grid):
+    """Returns the config of every cell of a {parameter: values} grid, defaults filled in."""
+    unknown = set(grid) - set(PARAMETERS)
+    if unknown:
+        raise ValueError(f"Unknown sweep parameter(s) {', '.join(sorted(unknown))}. "
+                         f"Choose from {', '.join(PARAMETERS)}.")
+    names = list(grid)
+    return [{**PARAMETERS, **dict(zip(names, values))} for values in itertools.product(*grid.values())]
+
+
+CACHE_FORMAT = 3  # Entries hold pieces named "chunk:offset:size", on a grid of block_size
+
+
+def cell_key(config, seed, chunk_size=CHUNK_SIZE, block_size=BLOCK_SIZE):
+    """Hash naming a cell's cache entry; n is left out, since entries grow to any n."""
+    text = json.dumps({"config": config, "seed": seed, "chunk_size": chunk_size, "block_size": block_size,
+                       "format": CACHE_FORMAT}, sort_keys=True)
+    return hashlib.sha256(text.encode()).hexdigest()[:24]
+
+
+def chunk_plan(num_simulations, chunk_size=CHUNK_SIZE):
+    """The (index, size) chunks making up num_simulations rounds: whole chunks, then any remainder."""
+    whole, remainder = divmod(num_simulations, chunk_size)
+    plan = [(index, chunk_size) for index in range(whole)]
+    if remainder:
+        plan.append((whole, remainder))
+    return plan
+
+
+def piece_plan(index, size, block_size=BLOCK_SIZE):
+    """The (index, offset, size) pieces covering rounds [0, size) of chunk index: whole blocks, then any remainder."""
+    return [(index, offset, min(block_size, size - offset)) for offset in range(0, size, block_size)]
+
+
+def run_piece(config, seed, index, offset, size):
+    """Plays one piece of a chunk of a cell and returns its Player/Computer/Tie counts and Units."""
+    if config["rules"] not in RULE_SETS:
+        raise ValueError(f"Unknown rule set {config['rules']!r}. Choose from {', '.join(RULE_SETS)}.")
+    rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(index, offset, size)))
+    return batch_engine.simulate(size, rng, threshold_policy(config["threshold"]),
+                                 rules=RULE_SETS[config["rules"]], num_decks=config["decks"])
+
+
+class SweepCache:
+    """One JSON file of chunk counts per cell, evicting least recently used cells past max_bytes.
+
+    Reading a cell refreshes its modification time, which orders the evictions.
+    """
+
+    def __init__(self, directory=SWEEP_CACHE_DIR, max_bytes=MAX_CACHE_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key):
+        """Returns the cell's {"pieces": {"chunk:offset:size": counts}} entry, or None."""
+        path = self._path(key)
+        try:
+            with open(path) as f:
+                entry = json.load(f)
+            os.utime(path)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        return entry
+
+    def put(self, key, entry):
+        os.makedirs(self.directory, exist_ok=True)
+        # Write then rename, so a concurrent reader never sees half an entry
+        fd, temp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(entry, f)
+        os.replace(temp, self._path(key))
+        self.evict()
+
+    def evict(self):
+        """Deletes least recently used cells until the cache fits in max_bytes."""
+        if not os.path.isdir(self.directory):
+            return
+        files = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".json"):
+                stat = entry.stat()
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+
+def _merge(counts):
+    merged = dict.fromkeys(RESULT_KEYS, 0)
+    for chunk in counts:
+        for key in RESULT_KEYS:
+            merged[key] += chunk[key]
+    return merged
+
+
+def run_sweep(grid, num_simulations, seed=0, workers=None, cache=None, chunk_size=CHUNK_SIZE,
+              block_size=BLOCK_SIZE):
+    """Returns ([(config, results) for every cell of grid], rounds played), playing only rounds not yet cached.
+
+    results are batch_engine.simulate's counts for num_simulations rounds, with
+    "Units" and "UnitsSquared" (see Simulation.edge_summary). Missing pieces of all
+    cells are played together, in a process pool when workers > 1.
+    """
+    cache = SweepCache() if cache is None else cache
+    cells = grid_cells(grid)
+    plan = [piece for index, size in chunk_plan(num_simulations, chunk_size)
+            for piece in piece_plan(index, size, block_size)]
+    names = [f"{index}:{offset}:{size}" for index, offset, size in plan]
+    keys = [cell_key(config, seed, chunk_size, block_size) for config in cells]
+    entries = {}
+    missing = []  # (key, config, index, offset, size)
+    for key, config in zip(keys, cells):
+        if key in entries:
+            continue
+        entries[key] = cache.get(key) or {"config": config, "seed": seed, "chunk_size": chunk_size,
+                                          "block_size": block_size, "pieces": {}}
+        missing.extend((key, config) + piece for name, piece in zip(names, plan)
+                       if name not in entries[key]["pieces"])
+
+    if missing:
+        _, configs, indexes, offsets, sizes = zip(*missing)
+        arguments = [configs, [seed] * len(missing), indexes, offsets, sizes]
+        if (workers or 1) > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                played = list(pool.map(run_piece, *arguments))
+        else:
+            played = list(map(run_piece, *arguments))
+        for (key, _, index, offset, size), counts in zip(missing, played):
+            entries[key]["pieces"][f"{index}:{offset}:{size}"] = counts
+        for key in {key for key, *_ in missing}:
+            cache.put(key, entries[key])
+
+    results = [(config, _merge(entries[key]["pieces"][name] for name in names)) for key, config in zip(keys, cells)]
+    return results, sum(size for *_, size in missing)
+
+
+def _values(text):
+    """Parses a grid value: an int, a range like 12-20, or a name."""
+    if "-" in text and all(part.isdigit() for part in text.split("-", 1)):
+        low, high = map(int, text.split("-", 1))
+        return list(range(low, high + 1))
+    return [int(text)] if text.isdigit() else [text]
+
+
+def main(argv=None):
+    """Command-line entry point: runs a sweep and prints a row of results per cell."""
+    from Simulation import edge_summary
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threshold", nargs="+", default=["17"], help="hit below these totals, e.g. 12-20")
+    parser.add_argument("--decks", nargs="+", default=["1"], help="decks per shoe")
+    parser.add_argument("--rules", nargs="+", default=["classic"], choices=sorted(RULE_SETS))
+    parser.add_argument("-n", "--simulations", type=int, default=CHUNK_SIZE, help="rounds per cell")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--cache-dir", default=SWEEP_CACHE_DIR)
+    parser.add_argument("--max-cache-mb", type=float, default=MAX_CACHE_BYTES / 2 ** 20)
+    parser.add_argument("--format", choices=("text", "json"), default="text")
+    args = parser.parse_args(argv)
+
+    grid = {"threshold": [value for text in args.threshold for value in _values(text)],
+            "decks": [value for text in args.decks for value in _values(text)],
+            "rules": args.rules}
+    for name in ("threshold", "decks"):
+        if not all(isinstance(value, int) for value in grid[name]):
+            parser.error(f"--{name} takes numbers and ranges like 12-20")
+    cache = SweepCache(args.cache_dir, int(args.max_cache_mb * 2 ** 20))
+    cells, played = run_sweep(grid, args.simulations, args.seed, args.workers, cache)
+    rows = [{**config, **results, **edge_summary(results)} for config, results in cells]
+
+    if args.format == "json":
+        sys.stdout.write(json.dumps(rows, indent=2) + "\n")
+    else:
+        print(f"{'threshold':>9} {'decks':>5} {'rules':10} {'edge':>9} {'stderr':>8}")
+        for row in rows:
+            print(f"{row['threshold']:>9} {row['decks']:>5} {row['rules']:10} {row['edge']:+9.5f} {row['stderr']:8.5f}")
+    print(f"{played} round(s) played, {len(cells) * args.simulations - played} from the cache.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
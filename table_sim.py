@@ -0,0 +1,105 @@
+"""Multi-seat table simulation: several players share one dealer and a persistent shoe.
+
+Many shoes are played side by side as rows of NumPy arrays, each dealt round after
+round until its cut card comes out. Each round is batch_engine.play_round: one card
+to every seat and the dealer, then a second card each; seats then play in order,
+and the dealer plays if any bet is still waiting. Hands are settled under a RuleSet
+(see rules.py), by default play_blackjack's rules.
+"""
+import numpy as np
+
+from batch_engine import DEFAULT_POLICY, OUTCOMES, draw, new_decks, outcome_codes, play_round
+from rules import CLASSIC
+
+NOT_PLAYED = -1
+
+
+def _max_rounds(num_decks, penetration, seats):
+    """Upper bound on the rounds dealt from one shoe: each takes at least two cards per hand."""
+    return int(num_decks * 52 * penetration) // (2 * (seats + 1)) + 1
+
+
+def play_shoes(num_shoes, rng, seats=7, num_decks=6, penetration=0.75, policies=None, rules=CLASSIC):
+    """Plays num_shoes shoes through to the cut card.
+
+    policies is one Policy per seat (see strategy.py); None gives every seat the
+    default "hit below 17". Returns (net, start, cards): net[shoe, round, seat]
+    holds the units each seat won on a one-unit bet, or NaN after the shoe's last
+    round; start[shoe, round] is the number of cards dealt from the shoe before the
+    round began (NOT_PLAYED likewise); and cards[shoe, :] holds the values of the
+    shoe's cards in the order they were dealt.
+    """
+    policies = list(policies) if policies is not None else [DEFAULT_POLICY] * seats
+    if len(policies) != seats:
+        raise ValueError(f"Expected {seats} policies, one per seat, got {len(policies)}.")
+    policies = [policy or DEFAULT_POLICY for policy in policies]
+
+    shoe_size = num_decks * 52
+    cut = int(shoe_size * penetration)
+    max_rounds = _max_rounds(num_decks, penetration, seats)
+    net = np.full((num_shoes, max_rounds, seats), np.nan)
+    start = np.full((num_shoes, max_rounds), NOT_PLAYED, dtype=np.int16)
+
+    # Each row holds its shoe plus a spare one, in case a round runs past the last card
+    decks = new_decks(num_shoes, 2 * num_decks)
+    pointer = np.zeros(num_shoes, dtype=np.intp)
+
+    for round_index in range(max_rounds):
+        rows = np.flatnonzero(pointer < cut)
+        if not rows.size:
+            break
+        start[rows, round_index] = pointer[rows]
+
+        def deal(local):
+            return draw(decks, rows[local], pointer, rng, shoe_size)
+
+        net[rows, round_index] = play_round(deal, rows.size, policies, rules).T
+
+    return net, start, decks
+
+
+def seat_results(net):
+    """Player/Computer/Tie counts for each seat, as a list of dicts."""
+    results = []
+    for seat in range(net.shape[2]):
+        played = net[:, :, seat]
+        codes = outcome_codes(played[~np.isnan(played)])
+        results.append(dict(zip(OUTCOMES, np.bincount(codes, minlength=len(OUTCOMES)).tolist())))
+    return results
+
+
+def edge_by_depth(net, start, shoe_size, bins=10):
+    """Each seat's mean units won per round, by how deep into the shoe the round began.
+
+    Returns (bin_edges, edges), with bin_edges as fractions of the shoe dealt;
+    edges[bin, seat] is NaN for bins with no rounds.
+    """
+    played = ~np.isnan(net)
+    bin_edges = np.linspace(0.0, 1.0, bins + 1)
+    which = np.clip(np.digitize(start / shoe_size, bin_edges) - 1, 0, bins - 1)
+
+    totals = np.zeros((bins, net.shape[2]))
+    counts = np.zeros((bins, net.shape[2]))
+    np.add.at(totals, which, np.where(played, net, 0.0))
+    np.add.at(counts, which, played)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return bin_edges, totals / counts
+
+
+def simulate_table(num_shoes, seats=7, num_decks=6, penetration=0.75, policies=None, rng=None,
+                   batch_size=2_000, rules=CLASSIC):
+    """Plays num_shoes shoes in batches and returns the per-seat Player/Computer/Tie counts, plus "Units" won."""
+    if rng is None:
+        rng = np.random.default_rng()
+    totals = [{**{outcome: 0 for outcome in OUTCOMES}, "Units": 0.0} for _ in range(seats)]
+    remaining = num_shoes
+    while remaining > 0:
+        size = min(batch_size, remaining)
+        net, _, _ = play_shoes(size, rng, seats, num_decks, penetration, policies, rules)
+        units = np.nansum(net, axis=(0, 1))
+        for seat, counts in enumerate(seat_results(net)):
+            for outcome, count in counts.items():
+                totals[seat][outcome] += count
+            totals[seat]["Units"] += float(units[seat])
+        remaining -= size
+    return totals
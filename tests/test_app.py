@@ -0,0 +1,125 @@
+import json
+
+import pytest
+
+import app as web
+
+
+@pytest.fixture
+def client():
+    web.app.config["TESTING"] = True
+    return web.app.test_client()
+
+
+def current_game(client):
+    with client.session_transaction() as session:
+        return web.store.get(session["sid"])
+
+
+def test_draws_follow_the_seed_and_cursor():
+    game = {"seed": 42, "cursor": 0}
+    cards = [web.draw_card(game) for _ in range(52)]
+    assert sorted(cards) == list(range(52))
+    assert game["cursor"] == 52
+    assert cards == list(web.initialize_deck(42).to_bytes())
+
+
+def test_game_lives_in_the_store(client):
+    client.get("/")
+    game = current_game(client)
+    assert game["cursor"] == 4
+    assert set(game) >= {"seed", "cursor", "player_hand", "computer_hand"}
+    assert "deck" not in game
+    cookie = client.get_cookie("session")
+    assert len(cookie.value) < 100
+
+    client.post("/hit")
+    game = current_game(client)
+    assert len(game["player_hand"]) + len(game["computer_hand"]) == game["cursor"]
+    assert len(json.dumps(game)) < 400
+
+
+def test_reset_forgets_the_game(client):
+    client.get("/")
+    with client.session_transaction() as session:
+        sid = session["sid"]
+    client.post("/reset")
+    assert web.store.get(sid) is None
+
+
+def test_api_answers_with_only_what_changed(client):
+    assert client.post("/api/hit").status_code == 404
+
+    full = client.get("/api/game").get_json()
+    assert {"player_cards", "computer_cards", "player_score", "game_over", "message"} <= set(full)
+    if full["game_over"]:
+        assert client.post("/api/hit").get_json() == {}
+        return
+    changed = client.post("/api/hit").get_json()
+    assert len(changed["player_cards"]) == 3
+    assert "computer_cards" not in changed or changed["game_over"]
+
+    fresh = client.post("/api/reset").get_json()
+    assert len(fresh["player_cards"]) == 2
+
+
+def test_asgi_app():
+    pytest.importorskip("asgiref")
+    import asgi
+    assert asgi.asgi_app.wsgi_application is web.app
+
+
+def test_page_draws_cards_from_the_sprite_sheet(client, monkeypatch):
+    sprites = tuple({'image': f'/static/build/{card}.webp', 'image_avif': None, 'sprite': f'card-sprite card-{card}'}
+                    for card in range(52))
+    monkeypatch.setattr(web, "CARD_IMAGES", sprites)
+    monkeypatch.setattr(web, "CARD_CSS", "/static/build/cards.0123456789ab.css")
+    html = client.get("/").get_data(as_text=True)
+    assert '<link rel="stylesheet" href="/static/build/cards.0123456789ab.css">' in html
+    assert html.count('class="card card-sprite card-') >= 3
+    assert '<img src="/static/build/' not in html
+
+
+def start_open_game(client):
+    """Starts games until one is still in play (not settled by a natural)."""
+    while True:
+        client.post("/reset")
+        client.get("/")
+        game = current_game(client)
+        if not game["game_over"]:
+            return game
+
+
+def test_stand_events_only_in_full_dealer_play(client, monkeypatch):
+    monkeypatch.setattr(web, "DEALER_PLAYS_OUT", False)
+    start_open_game(client)
+    assert client.get("/stand/events").status_code == 404
+    assert not current_game(client)["game_over"]
+
+
+def test_stand_events_stream_the_dealers_cards(client, monkeypatch):
+    monkeypatch.setattr(web, "DEALER_PLAYS_OUT", True)
+    start_open_game(client)
+    response = client.get("/stand/events")
+    assert response.content_type == "text/event-stream"
+    body = response.get_data(as_text=True)
+    game = current_game(client)
+    assert game["game_over"]
+    assert body.count("event: card") == len(game["computer_hand"]) - 1
+    assert body.count("event: result") == 1
+    # A reconnect replays the same events
+    assert client.get("/stand/events").get_data(as_text=True) == body
+
+
+def test_dealer_draws_only_while_the_rules_say_hit(client, monkeypatch):
+    monkeypatch.setattr(web, "DEALER_PLAYS_OUT", True)
+    for _ in range(50):
+        start_open_game(client)
+        client.post("/stand")
+        game = current_game(client)
+        assert game["game_over"]
+        states = [web.EMPTY_HAND]
+        for card in game["computer_hand"]:
+            states.append(web.add_card(states[-1], card))
+        assert all(web.RULES.dealer_hits[state] for state in states[2:-1])
+        assert game["computer_score"] > 21 or not web.RULES.dealer_hits[states[-1]]
@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+from bankroll import QuantileSketch, simulate_bankrolls
+
+
+def test_quantiles_of_values_on_the_grid_are_exact():
+    values = np.random.default_rng(3).integers(-50, 50, 100_001).astype(float)
+    sketch, other = QuantileSketch(), QuantileSketch()
+    sketch.add(values[:50_000])
+    other.add(values[50_000:])
+    sketch.merge(other)
+    expected = np.quantile(values, [0.05, 0.25, 0.5, 0.75, 0.95])
+    assert list(sketch.quantiles().values()) == list(expected)
+
+
+def test_quantiles_are_within_half_a_bin():
+    values = np.random.default_rng(4).normal(size=100_000)
+    sketch = QuantileSketch(0.1)
+    sketch.add(values)
+    for q, value in sketch.quantiles().items():
+        assert abs(value - np.quantile(values, q)) <= 0.05 + 1e-9
+
+
+def test_only_equal_widths_merge():
+    with pytest.raises(ValueError):
+        QuantileSketch(1.0).merge(QuantileSketch(0.5))
+
+
+def test_ruined_paths_report_zero():
+    report = simulate_bankrolls(([-1.0], [1.0]), num_paths=2000, num_hands=50, bankroll=10,
+                                rng=np.random.default_rng(0))
+    assert report["ruin_probability"] == 1.0
+    assert report["mean_ruin_hand"] == 10
+    assert set(report["final_quantiles"].values()) == {0.0}
+    assert set(report["max_drawdown_quantiles"].values()) == {10.0}
+
+
+def test_ruin_probability_matches_gamblers_ruin():
+    # Winning 60% of one-unit bets from 5 units, ruin has probability (0.4 / 0.6) ** 5
+    report = simulate_bankrolls(([-1.0, 1.0], [0.4, 0.6]), num_paths=5_000, num_hands=2_000, bankroll=5,
+                                rng=np.random.default_rng(6), chunk_size=5_000 * 300)
+    assert report["ruin_probability"] == pytest.approx((0.4 / 0.6) ** 5, abs=0.02)
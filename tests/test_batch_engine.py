@@ -0,0 +1,29 @@
+import math
+
+import numpy as np
+
+import batch_engine
+from rules import CLASSIC
+from Simulation import edge_summary, monte_carlo_simulation
+
+
+def test_numpy_engine_matches_python_engine():
+    python = edge_summary(monte_carlo_simulation(100_000, engine="python", seed=1))
+    numpy = edge_summary(monte_carlo_simulation(400_000, engine="numpy", seed=1))
+    assert abs(python["edge"] - numpy["edge"]) < 4 * math.hypot(python["stderr"], numpy["stderr"])
+    assert -0.09 < numpy["edge"] < -0.06
+
+
+def test_batches_add_up():
+    results = batch_engine.simulate(25_000, np.random.default_rng(0), batch_size=10_000, rules=CLASSIC)
+    assert sum(results[outcome] for outcome in batch_engine.OUTCOMES) == 25_000
+    assert results["Units"] == results["Player"] - results["Computer"]
+
+
+def test_draw_deals_every_card_once():
+    decks = batch_engine.new_decks(100)
+    pointer = np.zeros(100, dtype=np.intp)
+    rows = np.arange(100)
+    rng = np.random.default_rng(0)
+    dealt = np.stack([batch_engine.draw(decks, rows, pointer, rng) for _ in range(52)], axis=1)
+    assert (np.sort(dealt, axis=1) == np.sort(batch_engine.new_decks(1)[0])).all()
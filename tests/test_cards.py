@@ -0,0 +1,70 @@
+import random
+
+import pytest
+
+from cards import (DECK_SIZE, EMPTY_HAND, MAX_HARD, RANKS, STATE_SOFT, SUITS, Hand, Shoe, add_card, card_name,
+                   card_rank, card_suit, card_symbol, card_value, evaluate_hand, state_value)
+
+ACE_OF_SPADES, KING_OF_DIAMONDS = 0, 51
+
+
+def test_card_ints_cover_every_rank_and_suit():
+    assert {(card_rank(card), card_suit(card)) for card in range(DECK_SIZE)} == {
+        (rank, suit) for rank in range(len(RANKS)) for suit in range(len(SUITS))}
+    assert card_name(ACE_OF_SPADES) == "A of Spades"
+    assert card_symbol(KING_OF_DIAMONDS) == "K♦"
+
+
+def test_card_values():
+    assert [card_value(card) for card in range(13)] == [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 10, 10, 10]
+
+
+def test_evaluate_hand_counts_one_ace_as_eleven_when_it_fits():
+    ace, five, king = 0, 4, 12
+    assert evaluate_hand([ace, king]) == 21
+    assert evaluate_hand([ace, ace]) == 12
+    assert evaluate_hand([ace, five, king]) == 16
+    assert evaluate_hand([king, king, five]) == 25
+
+
+@pytest.mark.parametrize("random_draw", [False, True])
+@pytest.mark.parametrize("num_decks", [1, 6])
+def test_shoe_deals_every_card_once(num_decks, random_draw):
+    shoe = Shoe(num_decks, random_draw=random_draw, rng=random.Random(1))
+    dealt = sorted(shoe.draw() for _ in range(len(shoe)))
+    assert dealt == sorted(list(range(DECK_SIZE)) * num_decks)
+
+
+def test_shoe_reshuffles_at_the_cut_card():
+    shoe = Shoe(penetration=0.5, rng=random.Random(1))
+    for _ in range(25):
+        shoe.draw()
+    assert not shoe.needs_shuffle()
+    shoe.draw()
+    assert shoe.needs_shuffle()
+    assert len(Shoe(cards=shoe.to_bytes())) == DECK_SIZE - 26
+
+
+def test_hand_transitions_match_evaluate_hand():
+    rng = random.Random(0)
+    for _ in range(5000):
+        cards = rng.sample(range(DECK_SIZE), rng.randint(1, 8))
+        state = EMPTY_HAND
+        for card in cards:
+            state = add_card(state, card)
+        assert state_value(state) == min(evaluate_hand(cards), MAX_HARD)
+
+
+def test_every_two_card_hand():
+    for first in range(DECK_SIZE):
+        for second in range(DECK_SIZE):
+            hand = Hand((first, second))
+            assert hand.value() == evaluate_hand((first, second))
+            assert hand.is_soft() == (hand.value() != card_value(first) + card_value(second))
+            assert hand.is_blackjack() == (hand.value() == 21)
+
+
+def test_soft_states_hold_an_ace_counted_as_eleven():
+    for state, soft in enumerate(STATE_SOFT):
+        hard, has_ace = divmod(state, 2)
+        assert soft == bool(has_ace and hard <= 11)
@@ -0,0 +1,47 @@
+import itertools
+import math
+
+import pytest
+
+from Simulation import compare_policies
+from strategy import threshold_policy
+
+STAND_ON_17, STAND_ON_12 = threshold_policy(17), threshold_policy(12)
+
+
+def test_every_variant_estimates_the_same_difference():
+    reference = compare_policies(STAND_ON_17, STAND_ON_12, 60_000, seed=1, common=False, antithetic=False,
+                                 stratify=False)
+    for common, antithetic, stratify in itertools.product((True, False), repeat=3):
+        summary = compare_policies(STAND_ON_17, STAND_ON_12, 60_000, seed=2, common=common,
+                                   antithetic=antithetic, stratify=stratify)
+        assert abs(summary["difference"] - reference["difference"]) < 4 * math.hypot(summary["stderr"],
+                                                                                     reference["stderr"])
+
+
+def test_common_decks_reduce_the_variance():
+    summary = compare_policies(STAND_ON_17, STAND_ON_12, 30_000, seed=1)
+    assert summary["variance_reduction"] > 1.5
+    assert summary["ci"][0] < summary["difference"] < summary["ci"][1]
+
+
+def test_a_policy_against_itself():
+    summary = compare_policies(STAND_ON_17, STAND_ON_17, 2_600, seed=1)
+    assert summary["difference"] == 0.0 and summary["stderr"] == 0.0
+    assert set(summary["by_upcard"].values()) == {0.0}
+
+
+def test_by_upcard_is_the_same_with_and_without_mirroring():
+    with_mirror = compare_policies(STAND_ON_17, STAND_ON_12, 130_000, seed=3)["by_upcard"]
+    without = compare_policies(STAND_ON_17, STAND_ON_12, 130_000, seed=3, antithetic=False)["by_upcard"]
+    assert list(with_mirror) == list(range(1, 11))
+    for upcard in with_mirror:
+        assert with_mirror[upcard] == pytest.approx(without[upcard], abs=0.03)
+
+
+@pytest.mark.parametrize("stratify, minimum", [(True, 26), (False, 2)])
+def test_too_few_samples(stratify, minimum):
+    with pytest.raises(ValueError):
+        compare_policies(STAND_ON_17, STAND_ON_12, minimum - 1, stratify=stratify)
+    summary = compare_policies(STAND_ON_17, STAND_ON_12, minimum, seed=1, stratify=stratify)
+    assert math.isfinite(summary["stderr"])
@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from counting import HI_LO, KO, OMEGA_II, bet_units, count_index, simulate_counting
+from rules import VEGAS_S17
+from strategy import basic_strategy
+
+SHOE_VALUES = [value for value in range(1, 11) for _ in range(16 if value == 10 else 4)]
+
+
+@pytest.mark.parametrize("system", [HI_LO, OMEGA_II])
+def test_balanced_counts_end_a_shoe_at_zero(system):
+    for num_decks in (1, 6):
+        assert system.initial_count(num_decks) + num_decks * sum(system.tags[v] for v in SHOE_VALUES) == 0
+
+
+def test_ko_ends_every_shoe_at_four():
+    for num_decks in range(1, 9):
+        assert KO.initial_count(num_decks) + num_decks * sum(KO.tags[v] for v in SHOE_VALUES) == 4
+
+
+def test_bet_units():
+    ramp = {1: 1, 2: 2, 4: 8}
+    assert bet_units(np.array([-3, 0, 1, 2, 3, 4, 9]), ramp).tolist() == [1, 1, 1, 2, 2, 8, 8]
+
+
+def test_true_count_is_per_deck_left():
+    running = np.array([6, 6, -6, 6])
+    cards_left = np.array([156, 52, 104, 10])
+    assert count_index(HI_LO, running, cards_left).tolist() == [2, 6, -3, 12]
+    assert count_index(KO, running, cards_left).tolist() == running.tolist()
+
+
+def test_flat_bets_win_the_same_per_hand_and_per_unit():
+    report = simulate_counting(300, ramp={0: 1}, rng=np.random.default_rng(0))
+    assert report["units_bet"] == report["hands"]
+    assert report["ev_per_unit"] == pytest.approx(report["ev_per_hand"])
+    assert sum(report["hands_by_count"].values()) == report["hands"]
+
+
+def test_high_counts_favour_the_player():
+    # Under 3:2 natural payouts and doubling, played by basic strategy
+    policy = basic_strategy(6, rules=VEGAS_S17)
+    report = simulate_counting(8_000, ramp={0: 1}, policies=[policy], rng=np.random.default_rng(1), rules=VEGAS_S17)
+
+    def edge(counts):
+        counts = [count for count in counts if report["hands_by_count"][count]]
+        hands = sum(report["hands_by_count"][count] for count in counts)
+        won = sum(report["hands_by_count"][count] * report["ev_by_count"][count] for count in counts)
+        return won / hands
+
+    assert edge(range(1, 25)) > edge(range(-24, 0)) + 0.005
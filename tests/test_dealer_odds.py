@@ -0,0 +1,35 @@
+import pytest
+
+from dealer_odds import DEALER_OUTCOMES, dealer_probabilities, full_shoe
+
+
+@pytest.mark.parametrize("num_decks", [1, 6])
+def test_distributions_sum_to_one(num_decks):
+    for upcard in range(1, 11):
+        for no_blackjack in (False, True):
+            probabilities = dealer_probabilities(upcard, num_decks=num_decks, no_blackjack=no_blackjack)
+            assert list(probabilities) == list(DEALER_OUTCOMES)
+            assert sum(probabilities.values()) == pytest.approx(1.0)
+            assert min(probabilities.values()) >= 0.0
+
+
+@pytest.mark.parametrize("upcard, bust", [(6, 0.42), (10, 0.23), (1, 0.17)])
+def test_known_bust_rates(upcard, bust):
+    # Single deck, dealer stands on soft 17, after checking for a natural
+    assert dealer_probabilities(upcard, no_blackjack=True)["bust"] == pytest.approx(bust, abs=0.01)
+
+
+def test_naturals_only_under_ace_and_ten():
+    for upcard in range(2, 10):
+        assert dealer_probabilities(upcard)["blackjack"] == 0.0
+    assert dealer_probabilities(1)["blackjack"] == pytest.approx(16 / 51)
+    assert dealer_probabilities(10)["blackjack"] == pytest.approx(4 / 51)
+
+
+def test_composition():
+    only_tens = (0,) * 9 + (8,)
+    assert dealer_probabilities(6, only_tens)["bust"] == 1.0
+    assert dealer_probabilities(7, only_tens)[17] == 1.0
+    shoe = list(full_shoe())
+    shoe[5] -= 1  # The upcard
+    assert dealer_probabilities(6, shoe) == dealer_probabilities(6)
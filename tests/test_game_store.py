@@ -0,0 +1,42 @@
+import pytest
+
+from game_store import MemoryGameStore, SQLiteGameStore, make_store
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        return MemoryGameStore()
+    return SQLiteGameStore(str(tmp_path / "games.sqlite3"))
+
+
+def test_round_trip(store):
+    game = {"seed": 1, "cursor": 4, "player_hand": [0, 12], "game_over": False}
+    store.put("a", game)
+    assert store.get("a") == game
+    assert store.get("b") is None
+    store.delete("a")
+    assert store.get("a") is None
+
+
+def test_expired_games_are_gone(store):
+    store.ttl = -1
+    store.put("a", {"cursor": 0})
+    assert store.get("a") is None
+
+
+def test_memory_store_evicts_least_recently_used():
+    store = MemoryGameStore(max_games=2)
+    store.put("a", {})
+    store.put("b", {})
+    store.get("a")
+    store.put("c", {})
+    assert store.get("b") is None
+    assert store.get("a") == {} and store.get("c") == {}
+
+
+def test_make_store(tmp_path):
+    assert isinstance(make_store(), MemoryGameStore)
+    assert isinstance(make_store(f"sqlite:{tmp_path / 'games.sqlite3'}"), SQLiteGameStore)
+    with pytest.raises(ValueError):
+        make_store("redis://localhost")
@@ -0,0 +1,68 @@
+import os
+
+import numpy as np
+import pytest
+
+import hand_log
+from hand_log import CARD_VALUES, MAX_CARDS, TRUNCATED, HandLog, hands, read_log
+from rules import HIT, STAND
+from Simulation import monte_carlo_simulation
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / "hands.log")
+    with HandLog(path, seed=5) as log:
+        log.append([0, 12], [5, 9], 0)
+        log.append([1, 2, 3, 4], [10, 11], 1, payout=-1.0)
+    with HandLog(path, seed=6, first_round=2) as log:
+        log.append(list(range(20)), list(range(20, 30)), 2)
+
+    records = read_log(path)
+    assert records["seed"].tolist() == [5, 5, 6]
+    assert records["round"].tolist() == [0, 1, 2]
+    assert records["action"].tolist() == [STAND, HIT, HIT]
+    assert records["payout"].tolist() == [1.0, -1.0, 0.0]
+    assert hands(records[0]) == ([0, 12], [5, 9])
+    assert hands(records[1]) == ([1, 2, 3, 4], [10, 11])
+    assert records[2]["num_cards"] == MAX_CARDS and records[2]["flags"] & TRUNCATED
+
+
+def test_simulation_logs_every_round(tmp_path):
+    path = str(tmp_path / "hands.log")
+    results = monte_carlo_simulation(5_000, engine="numpy", workers=2, seed=3, history=path)
+    records = read_log(path)
+    assert sorted(records["round"].tolist()) == list(range(5_000))
+    assert (records["flags"] & CARD_VALUES).all()
+    outcomes = np.bincount(records["outcome"], minlength=3)
+    assert outcomes.tolist() == [results["Player"], results["Computer"], results["Tie"]]
+
+
+def test_partial_records_are_left_out(tmp_path):
+    path = str(tmp_path / "hands.log")
+    with HandLog(path) as log:
+        log.append([0, 1], [2, 3], 2)
+    with open(path, "ab") as f:
+        f.write(b"\0" * 7)
+    assert len(read_log(path)) == 1
+
+
+def test_short_writes_are_retried(tmp_path, monkeypatch):
+    path = str(tmp_path / "hands.log")
+    write = os.write
+    monkeypatch.setattr(hand_log.os, "write", lambda fd, data: write(fd, bytes(data[:7])))
+    with HandLog(path, buffer_records=64) as log:
+        for round_number in range(1000):
+            log.append([0, 1, round_number % 52], [2, 3], 1)
+    monkeypatch.undo()
+    records = read_log(path)
+    assert records["round"].tolist() == list(range(1000))
+    assert [hands(record)[0][2] for record in records] == [n % 52 for n in range(1000)]
+
+
+def test_other_files_are_refused(tmp_path):
+    path = tmp_path / "other.log"
+    path.write_bytes(b"not a hand log at all")
+    with pytest.raises(ValueError):
+        read_log(str(path))
+    with pytest.raises(ValueError):
+        HandLog(str(path))
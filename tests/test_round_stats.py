@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from round_stats import MAX_DRAWS, RoundStats
+from Simulation import monte_carlo_simulation
+
+
+def sample_rounds(num_rounds, rng):
+    return dict(upcard=rng.integers(1, 11, num_rounds), draws=rng.integers(0, 25, num_rounds),
+                player_score=rng.integers(4, 31, num_rounds), dealer_score=rng.integers(17, 27, num_rounds),
+                dealer_played=rng.random(num_rounds) < 0.8, player_natural=rng.random(num_rounds) < 0.05,
+                dealer_natural=rng.random(num_rounds) < 0.05)
+
+
+def test_batches_count_the_same_as_single_rounds():
+    rounds = sample_rounds(1_000, np.random.default_rng(0))
+    batch, single = RoundStats(), RoundStats()
+    batch.record_batch(**rounds)
+    for values in zip(*rounds.values()):
+        single.record_round(*(value.item() for value in values))
+    assert batch.to_dict() == single.to_dict()
+    assert batch.player_draws[MAX_DRAWS] == np.count_nonzero(rounds["draws"] >= MAX_DRAWS)
+
+
+def test_merge_adds_the_counters():
+    rng = np.random.default_rng(1)
+    first, second = sample_rounds(500, rng), sample_rounds(700, rng)
+    whole = RoundStats()
+    whole.record_batch(**{name: np.concatenate([first[name], second[name]]) for name in first})
+    parts = [RoundStats(), RoundStats()]
+    parts[0].record_batch(**first)
+    parts[1].record_batch(**second)
+    assert parts[0].merge(parts[1]).to_dict() == whole.to_dict()
+
+
+@pytest.mark.parametrize("engine, num_simulations", [("python", 20_000), ("numpy", 40_000)])
+def test_worker_stats_are_merged(engine, num_simulations):
+    one, three = RoundStats(), RoundStats()
+    monte_carlo_simulation(num_simulations, engine=engine, workers=1, seed=7, stats=one)
+    monte_carlo_simulation(num_simulations, engine=engine, workers=3, seed=7, stats=three)
+    for stats in (one, three):
+        assert stats.rounds == num_simulations
+        assert stats.player_totals.sum() == num_simulations
+        assert stats.summary()["dealer_bust_rate"][6] == pytest.approx(0.42, abs=0.05)
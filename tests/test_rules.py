@@ -0,0 +1,60 @@
+import os
+
+import numpy as np
+import pytest
+
+import batch_engine
+from cards import EMPTY_HAND, add_card
+from dealer_odds import dealer_probabilities
+from rules import BUST, CLASSIC, PLAY_ON, RULE_SETS, VEGAS_H17, VEGAS_S17, WIN, compile_rules
+from Simulation import edge_summary
+from strategy import SOLVER_VERSION, basic_strategy
+
+SIX, ACE = 5, 0  # Card ints of the 6 and Ace of Spades
+
+
+def state_of(*cards):
+    state = EMPTY_HAND
+    for card in cards:
+        state = add_card(state, card)
+    return state
+
+
+def test_dealer_hits_soft_17_only_under_h17():
+    soft_17, hard_17, sixteen = state_of(ACE, SIX), state_of(SIX, SIX, 4), state_of(SIX, 9)
+    for rules, hits_soft_17 in ((CLASSIC, False), (VEGAS_S17, False), (VEGAS_H17, True)):
+        hits = compile_rules(rules).dealer_hits
+        assert hits[soft_17] == hits_soft_17
+        assert not hits[hard_17]
+        assert hits[sixteen]
+
+
+def test_hand_end():
+    assert compile_rules(CLASSIC).hand_end[21] == WIN
+    assert compile_rules(VEGAS_S17).hand_end[21] == PLAY_ON
+    assert compile_rules(VEGAS_S17).hand_end[22] == BUST
+
+
+def test_rules_compile_once():
+    assert compile_rules(VEGAS_S17) is compile_rules(RULE_SETS["vegas-s17"])
+
+
+def test_hitting_soft_17_busts_more():
+    for upcard in range(1, 11):
+        assert (dealer_probabilities(upcard, rules=VEGAS_H17)["bust"]
+                >= dealer_probabilities(upcard, rules=CLASSIC)["bust"])
+
+
+def test_basic_strategy_cache_is_versioned_per_rule_set(tmp_path):
+    basic_strategy(1, cache_dir=str(tmp_path))
+    basic_strategy(1, cache_dir=str(tmp_path), rules=VEGAS_S17)
+    names = sorted(os.listdir(tmp_path))
+    assert len(names) == 2
+    assert all(name.startswith(f"basic_strategy_v{SOLVER_VERSION}_1") for name in names)
+
+
+@pytest.mark.parametrize("rules", [VEGAS_S17, VEGAS_H17])
+def test_single_deck_basic_strategy_is_about_even(tmp_path, rules):
+    policy = basic_strategy(1, cache_dir=str(tmp_path), rules=rules)
+    summary = edge_summary(batch_engine.simulate(400_000, np.random.default_rng(2), policy, rules=rules))
+    assert -0.015 < summary["edge"] < 0.01
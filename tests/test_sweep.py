@@ -0,0 +1,46 @@
+import pytest
+
+from sweep import SweepCache, chunk_plan, grid_cells, piece_plan, run_sweep
+
+GRID = {"threshold": [16]}
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return SweepCache(str(tmp_path / "sweep"))
+
+
+def sweep(cache, n, **kwargs):
+    return run_sweep(GRID, n, seed=1, cache=cache, chunk_size=100, block_size=30, **kwargs)
+
+
+@pytest.mark.parametrize("first, second", [(150, 180), (180, 150), (95, 260), (260, 261)])
+def test_results_do_not_depend_on_what_was_cached(tmp_path, cache, first, second):
+    sweep(cache, first)
+    topped_up, _ = sweep(cache, second)
+    fresh, played = sweep(SweepCache(str(tmp_path / "fresh")), second)
+    assert topped_up == fresh
+    assert played == second
+
+
+def test_only_missing_blocks_are_played(cache):
+    assert sweep(cache, 150)[1] == 150
+    # Chunk 1 held [0, 30) and a 20-round partial block; 180 needs [30, 60) and [60, 80) of it
+    assert sweep(cache, 180)[1] == 50
+    assert sweep(cache, 180)[1] == 0
+    assert sweep(cache, 150)[1] == 0
+
+
+def test_plans():
+    assert chunk_plan(250, 100) == [(0, 100), (1, 100), (2, 50)]
+    assert piece_plan(2, 50, 30) == [(2, 0, 30), (2, 30, 20)]
+    assert grid_cells({"threshold": [15, 16], "decks": [6]}) == [
+        {"threshold": 15, "decks": 6, "rules": "classic"}, {"threshold": 16, "decks": 6, "rules": "classic"}]
+    with pytest.raises(ValueError):
+        grid_cells({"speed": [1]})
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = SweepCache(str(tmp_path), max_bytes=0)
+    cache.put("a", {"pieces": {}})
+    assert cache.get("a") is None
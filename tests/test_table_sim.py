@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+from batch_engine import DECK_VALUES
+from table_sim import NOT_PLAYED, play_shoes, seat_results, simulate_table
+
+
+def test_rounds_follow_each_other_through_the_shoe():
+    net, start, cards = play_shoes(200, np.random.default_rng(0), seats=3, num_decks=2, penetration=0.75)
+    cut = int(2 * 52 * 0.75)
+    for shoe in range(200):
+        starts = start[shoe][start[shoe] != NOT_PLAYED]
+        assert starts[0] == 0
+        assert (np.diff(starts) >= 2 * 4).all()  # At least two cards to each of three seats and the dealer
+        assert starts[-1] < cut
+        rounds = len(starts)
+        assert not np.isnan(net[shoe, :rounds]).any()
+        assert np.isnan(net[shoe, rounds:]).all()
+    # The shoe part of every row is a whole shuffled shoe
+    expected = np.sort(np.tile(DECK_VALUES, 2))
+    assert (np.sort(cards[:, :104], axis=1) == expected).all()
+
+
+def test_one_policy_per_seat():
+    with pytest.raises(ValueError):
+        play_shoes(1, np.random.default_rng(0), seats=3, policies=[None, None])
+
+
+def test_seat_results_count_every_round():
+    net, start, _ = play_shoes(100, np.random.default_rng(1), seats=2)
+    rounds = int((start != NOT_PLAYED).sum())
+    for results in seat_results(net):
+        assert sum(results.values()) == rounds
+
+
+def test_every_seat_plays_about_the_single_seat_edge():
+    totals = simulate_table(3_000, seats=3, rng=np.random.default_rng(2))
+    for seat in totals:
+        hands = seat["Player"] + seat["Computer"] + seat["Tie"]
+        assert -0.10 < seat["Units"] / hands < -0.05
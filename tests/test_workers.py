@@ -0,0 +1,17 @@
+import pytest
+
+from Simulation import monte_carlo_simulation
+
+
+@pytest.mark.parametrize("engine, num_simulations", [("python", 3_000), ("numpy", 30_000)])
+@pytest.mark.parametrize("workers", [1, 3])
+def test_same_seed_same_results(engine, num_simulations, workers):
+    first = monte_carlo_simulation(num_simulations, engine=engine, workers=workers, seed=7)
+    assert monte_carlo_simulation(num_simulations, engine=engine, workers=workers, seed=7) == first
+    assert sum(first.values()) == num_simulations
+
+
+def test_other_seed_other_results():
+    first = monte_carlo_simulation(30_000, engine="numpy", workers=3, seed=7)
+    assert monte_carlo_simulation(30_000, engine="numpy", workers=3, seed=8) != first
+